@@ -0,0 +1,124 @@
+"""
+Mode deteksi adaptif untuk CPU.
+
+- Belum ada box: deteksi full-frame di imgsz rendah (cek ada obat atau tidak),
+  lalu deteksi ulang di crop sekitar box itu dengan resolusi asli crop.
+- Sudah ada box: deteksi hanya di crop (box sebelumnya + margin).
+- Tiap `refresh_s` detik, atau saat box hilang dari crop, balik ke
+  full-frame di imgsz penuh supaya obat baru di luar crop tetap ketemu.
+
+Hanya backend dengan input dinamis (PyTorch) yang bisa ganti imgsz per
+frame. Backend hasil export (ONNX/OpenVINO/NCNN) shape-nya tetap, jadi untuk
+backend itu selalu full-frame.
+"""
+import math
+import time
+
+DYNAMIC_BACKENDS = {"torch"}
+
+
+def box_iou(a, b):
+    """IoU dua box (x1, y1, x2, y2)"""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / float(area_a + area_b - inter)
+
+
+def parse_results(results, names, offset=(0, 0)):
+    """Results YOLO → list (x1, y1, x2, y2, label, conf) di koordinat frame"""
+    ox, oy = offset
+    detections = []
+    for result in results:
+        boxes = result.boxes.xyxy.cpu().numpy()
+        confs = result.boxes.conf.cpu().numpy()
+        clss = result.boxes.cls.cpu().numpy()
+        for box, conf, cls in zip(boxes, confs, clss):
+            x1, y1, x2, y2 = map(int, box)
+            detections.append((x1 + ox, y1 + oy, x2 + ox, y2 + oy, names[int(cls)], float(conf)))
+    return detections
+
+
+class AdaptiveDetector:
+    def __init__(self, device="cpu", full_imgsz=640, low_imgsz=320, margin=0.3, refresh_s=2.0):
+        self.device = device
+        self.full_imgsz = full_imgsz
+        self.low_imgsz = low_imgsz
+        self.margin = margin
+        self.refresh_s = refresh_s
+        self.region = None
+        self.last_full = 0.0
+        self.counts = {"full": 0, "presence": 0, "crop": 0}
+        self.active = False
+        self.fixed_backend = None   # backend terakhir yang membuat mode adaptif tidak jalan
+
+    def _run(self, yolo, image, imgsz, mode, offset=(0, 0)):
+        self.counts[mode] += 1
+        results = yolo(image, imgsz=imgsz, device=self.device, verbose=False)
+        return parse_results(results, yolo.names, offset)
+
+    def _update_region(self, detections, shape):
+        """Region = gabungan semua box + margin, di-clip ke ukuran frame"""
+        if not detections:
+            self.region = None
+            return
+        h, w = shape[:2]
+        x1 = min(d[0] for d in detections)
+        y1 = min(d[1] for d in detections)
+        x2 = max(d[2] for d in detections)
+        y2 = max(d[3] for d in detections)
+        mx, my = int((x2 - x1) * self.margin), int((y2 - y1) * self.margin)
+        self.region = (max(0, x1 - mx), max(0, y1 - my), min(w, x2 + mx), min(h, y2 + my))
+
+    def _crop(self, yolo, frame):
+        x1, y1, x2, y2 = self.region
+        if x2 - x1 < 8 or y2 - y1 < 8:
+            return []
+        # resolusi asli crop, dibulatkan ke kelipatan stride 32
+        imgsz = min(self.full_imgsz, int(math.ceil(max(x2 - x1, y2 - y1) / 32.0) * 32))
+        return self._run(yolo, frame[y1:y2, x1:x2], imgsz, "crop", offset=(x1, y1))
+
+    def full(self, yolo, frame):
+        detections = self._run(yolo, frame, self.full_imgsz, "full")
+        self.last_full = time.time()
+        self._update_region(detections, frame.shape)
+        return detections
+
+    def detect(self, yolo, frame, enabled=True):
+        backend = getattr(yolo, "backend", "torch")
+        self.active = enabled and backend in DYNAMIC_BACKENDS
+        if not self.active:
+            if enabled and backend != self.fixed_backend:
+                # YOLO_ADAPTIVE=1 tapi backend shape tetap: beri tahu sekali per backend
+                print(f"⚠️ YOLO_ADAPTIVE=1 diabaikan: backend {backend} input shape tetap, "
+                      f"deteksi selalu full-frame (pakai YOLO_BACKEND=torch untuk mode adaptif)")
+                self.fixed_backend = backend
+            return self.full(yolo, frame)
+        if time.time() - self.last_full > self.refresh_s:
+            return self.full(yolo, frame)
+
+        if self.region is not None:
+            detections = self._crop(yolo, frame)
+            if not detections:
+                # box hilang dari crop → cek ulang full-frame resolusi penuh
+                return self.full(yolo, frame)
+            self._update_region(detections, frame.shape)
+            return detections
+
+        detections = self._run(yolo, frame, self.low_imgsz, "presence")
+        if not detections:
+            return []
+        self._update_region(detections, frame.shape)
+        refined = self._crop(yolo, frame)
+        if refined:
+            self._update_region(refined, frame.shape)
+            return refined
+        return detections
+
+    def stats(self):
+        return {"active": self.active, "fixed_backend": self.fixed_backend,
+                "region": self.region, "counts": dict(self.counts)}
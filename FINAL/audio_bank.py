@@ -0,0 +1,287 @@
+"""
+Audio bank: ringkasan suara tiap obat di katalog, di-synthesize sebelumnya.
+
+Runtime memutar clip dari bank begitu deteksi lolos threshold, tanpa
+menunggu webhook + gTTS + konversi MP3→WAV.
+
+Format bank (dua file, append-only):
+  - obat.vmbank     : blob audio (MP3 dari gTTS / WAV dari mock) disambung
+  - obat.vmbank.idx : satu baris JSON per clip (key, nama, offset, size,
+                      format, sumber teks, sha teks). Baris terakhir per key
+                      yang berlaku.
+Clip ditulis + di-flush dulu ke blob, baru baris index-nya. Job yang mati di
+tengah jalan cukup dijalankan ulang: obat yang sudah ada di index dilewati
+(incremental), byte yatim di ujung blob dibuang saat --compact.
+
+Sumber teks:
+  - template (default) : --template "Obat terdeteksi, {nama}. ..." → clip
+                         pendek, runtime tetap ambil info lengkap dari webhook
+  - webhook            : --webhook URL → jawaban "Berikan Informasi Obat {nama}"
+                         dari n8n, runtime tidak perlu webhook lagi
+
+Contoh:
+    python audio_bank.py --csv "Data Obat - 70 Obat.csv" --out sounds/obat.vmbank --workers 4
+    python audio_bank.py --csv obat.csv --out sounds/obat.vmbank --webhook https://xxx.ngrok.app/webhook/... --workers 2
+    python audio_bank.py --csv obat.csv --out /tmp/mock.vmbank --mock-tts --mock-ms 300 --workers 8
+    python audio_bank.py --out sounds/obat.vmbank --compact
+"""
+import argparse
+import collections
+import hashlib
+import io
+import json
+import math
+import os
+import struct
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from response_cache import cache_key
+
+DEFAULT_TEMPLATE = "Obat terdeteksi, {nama}. Mohon tunggu, informasi lengkapnya sedang disiapkan."
+
+Clip = collections.namedtuple("Clip", ["key", "name", "offset", "size", "fmt", "source", "sha", "text"])
+
+
+def text_sha(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class AudioBank:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.clips = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+        self.blob = open(path, "rb") if os.path.exists(path) else None
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        blob_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    clip = Clip(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue    # baris terpotong karena job mati saat menulis
+                if clip.offset + clip.size <= blob_size:
+                    self.clips[clip.key] = clip
+
+    def __len__(self):
+        return len(self.clips)
+
+    def __contains__(self, name):
+        return cache_key(name) in self.clips
+
+    def clip(self, name):
+        return self.clips.get(cache_key(name))
+
+    def get(self, name):
+        """(clip, audio bytes) atau None"""
+        clip = self.clips.get(cache_key(name))
+        if clip is None or self.blob is None:
+            self.misses += 1
+            return None
+        with self.lock:
+            self.blob.seek(clip.offset)
+            data = self.blob.read(clip.size)
+        self.hits += 1
+        return clip, data
+
+    def add(self, name, text, data, fmt, source):
+        """Append satu clip (blob dulu, baru index)"""
+        with self.lock:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            clip = Clip(cache_key(name), name, offset, len(data), fmt, source, text_sha(text), text)
+            line = (json.dumps(clip._asdict(), ensure_ascii=False) + "\n").encode("utf-8")
+            with open(self.index_path, "a+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        # baris terakhir terpotong (job mati saat menulis):
+                        # mulai baris baru, jangan sambung ke baris rusak itu
+                        line = b"\n" + line
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.clips[clip.key] = clip
+            if self.blob is None:
+                self.blob = open(self.path, "rb")
+        return clip
+
+    def compact(self):
+        """Tulis ulang bank hanya dengan clip yang berlaku. Return byte yang dibuang"""
+        with self.lock:
+            if self.blob is None:
+                return 0
+            before = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            tmp_path, tmp_index = self.path + ".tmp", self.index_path + ".tmp"
+            clips = {}
+            with open(tmp_path, "wb") as out, open(tmp_index, "w", encoding="utf-8") as idx:
+                for clip in sorted(self.clips.values(), key=lambda c: c.key):
+                    self.blob.seek(clip.offset)
+                    data = self.blob.read(clip.size)
+                    clip = clip._replace(offset=out.tell())
+                    out.write(data)
+                    idx.write(json.dumps(clip._asdict(), ensure_ascii=False) + "\n")
+                    clips[clip.key] = clip
+            self.blob.close()
+            os.replace(tmp_path, self.path)
+            os.replace(tmp_index, self.index_path)
+            self.clips = clips
+            self.blob = open(self.path, "rb")
+            return before - os.path.getsize(self.path)
+
+    def close(self):
+        if self.blob is not None:
+            self.blob.close()
+            self.blob = None
+
+    def stats(self):
+        return {
+            "clips": len(self.clips),
+            "size_mb": round(sum(c.size for c in self.clips.values()) / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# ===============================
+# TTS
+# ===============================
+def gtts_mp3(text):
+    """gTTS langsung ke memori (MP3, tanpa konversi)"""
+    from gtts import gTTS
+    buffer = io.BytesIO()
+    gTTS(text, lang="id", tld="co.id").write_to_fp(buffer)
+    return buffer.getvalue(), "mp3"
+
+
+def mock_tts(text, ms=0.0, rate=16000):
+    """TTS palsu untuk uji offline: nada sinus ~60 ms per karakter (WAV mono 16-bit)"""
+    if ms:
+        time.sleep(ms / 1000.0)
+    n = int(rate * min(len(text) * 0.06, 20.0))
+    freq = 300 + int(text_sha(text)[:2], 16)
+    samples = struct.pack(f"<{n}h", *(int(8000 * math.sin(2 * math.pi * freq * i / rate)) for i in range(n)))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(samples)
+    return buffer.getvalue(), "wav"
+
+
+# ===============================
+# Batch job
+# ===============================
+def plan(bank, names, template=None, force=False, source=None):
+    """Obat yang perlu di-synthesize: belum ada, dibuat dari sumber teks lain
+    (template ↔ webhook), atau teks template berubah"""
+    todo = []
+    seen = set()
+    for name in names:
+        key = cache_key(name)
+        if key in seen:
+            continue
+        seen.add(key)
+        clip = bank.clips.get(key)
+        if force or clip is None:
+            todo.append(name)
+        elif source is not None and clip.source != source:
+            todo.append(name)
+        elif template is not None and clip.sha != text_sha(template.format(nama=name)):
+            todo.append(name)
+    return todo
+
+
+def build_bank(bank, names, summarize, synthesize, source, workers=4, log=print):
+    """Synthesize paralel, tulis ke bank tiap clip selesai (urutan selesai, bukan urutan katalog)"""
+    def job(name):
+        text = summarize(name)
+        if not text:
+            raise ValueError("ringkasan kosong")
+        data, fmt = synthesize(text)
+        return name, text, data, fmt
+
+    done = failed = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(job, name): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                name, text, data, fmt = future.result()
+            except Exception as e:
+                failed += 1
+                log(f"⚠️ {name}: {e}")
+                continue
+            bank.add(name, text, data, fmt, source)
+            done += 1
+            log(f"✅ [{done + failed}/{len(names)}] {name} ({len(data) / 1024:.1f} KB {fmt})")
+    return done, failed, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", help="CSV daftar obat (kolom nama_obat)")
+    parser.add_argument("--out", default="sounds/obat.vmbank", help="Path bank (index di <out>.idx)")
+    parser.add_argument("--template", default=None, help=f'Default: "{DEFAULT_TEMPLATE}"')
+    parser.add_argument("--webhook", default=None, help="Ambil ringkasan dari webhook n8n, bukan template")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="Synthesize ulang semua obat")
+    parser.add_argument("--compact", action="store_true", help="Buang clip lama / byte yatim dari blob")
+    parser.add_argument("--mock-tts", action="store_true", help="TTS palsu (offline, tanpa gTTS)")
+    parser.add_argument("--mock-ms", type=float, default=0.0, help="Latency TTS palsu per clip")
+    args = parser.parse_args()
+    if not args.csv and not args.compact:
+        parser.error("--csv wajib (kecuali --compact)")
+
+    if os.path.dirname(args.out):
+        os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    bank = AudioBank(args.out)
+
+    if args.csv:
+        from catalog import read_csv_names
+        names = read_csv_names(args.csv)
+        if args.webhook:
+            from webhook import WebhookClient
+            client = WebhookClient(workers=1)
+            summarize = lambda name: client.post(args.webhook, "System", f"Berikan Informasi Obat {name}")
+            template, source = None, "webhook"
+        else:
+            template = args.template or DEFAULT_TEMPLATE
+            summarize = lambda name: template.format(nama=name)
+            source = "template"
+        synthesize = (lambda text: mock_tts(text, args.mock_ms)) if args.mock_tts else gtts_mp3
+
+        todo = plan(bank, names, template, args.force, source)
+        print(f"💊 {len(names)} obat di katalog, {len(bank)} sudah di bank, {len(todo)} perlu di-synthesize")
+        if todo:
+            done, failed, elapsed = build_bank(bank, todo, summarize, synthesize, source, args.workers)
+            print(f"🎞️ {done} clip baru, {failed} gagal dalam {elapsed:.1f} detik "
+                  f"({done / elapsed if elapsed else 0:.2f} clip/detik, {args.workers} worker)")
+            if failed:
+                print("⚠️ Jalankan ulang untuk melanjutkan obat yang gagal")
+
+    if args.compact:
+        freed = bank.compact()
+        print(f"✅ Compact: {freed / 1024:.1f} KB dibuang")
+    print(bank.stats())
+    bank.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark deteksi adaptif vs full-frame 640 di video rekaman.
+
+Contoh:
+    python bench_adaptive.py --model best_tuned.pt
+    python bench_adaptive.py --model best_tuned.pt --video ../YOLO/Draft/medicine1.mp4 --frames 300
+"""
+import argparse
+import time
+
+import cv2
+from ultralytics import YOLO
+
+from adaptive import AdaptiveDetector, box_iou, parse_results
+
+
+def read_frames(path, limit, size=(640, 480)):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, size))
+    cap.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", required=True, help="Weights YOLO (.pt)")
+    parser.add_argument("--video", default="../YOLO/Draft/medicine1.mp4")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--low-imgsz", type=int, default=320)
+    parser.add_argument("--refresh", type=float, default=2.0, help="Detik antar full-frame 640")
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        print(f"Video {args.video} tidak bisa dibaca")
+        return
+    model = YOLO(args.model, task="detect")
+    model(frames[0], imgsz=640, device="cpu", verbose=False)   # warmup
+
+    t0 = time.perf_counter()
+    baseline = [parse_results(model(f, imgsz=640, device="cpu", verbose=False), model.names) for f in frames]
+    base_fps = len(frames) / (time.perf_counter() - t0)
+
+    adaptive = AdaptiveDetector(device="cpu", low_imgsz=args.low_imgsz, refresh_s=args.refresh)
+    t0 = time.perf_counter()
+    found = [adaptive.detect(model, f) for f in frames]
+    adaptive_fps = len(frames) / (time.perf_counter() - t0)
+
+    # recall terhadap full-frame 640: box baseline yang ketemu lagi (IoU >= 0.5)
+    total = sum(len(b) for b in baseline)
+    matched = sum(
+        1 for base, ours in zip(baseline, found) for b in base
+        if any(box_iou(b[:4], o[:4]) >= 0.5 for o in ours)
+    )
+
+    print(f"🎞️ {len(frames)} frame dari {args.video}")
+    print(f"Full-frame 640 : {base_fps:6.2f} deteksi/detik")
+    print(f"Adaptif        : {adaptive_fps:6.2f} deteksi/detik ({adaptive_fps / base_fps:.2f}x)")
+    print(f"Mode           : {adaptive.counts}")
+    print(f"Recall vs 640  : {matched}/{total} ({matched / total:.1%})" if total else "Recall vs 640  : tidak ada box")
+
+
+if __name__ == "__main__":
+    main()
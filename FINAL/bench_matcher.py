@@ -0,0 +1,154 @@
+"""
+Benchmark pencocokan nama obat: loop textdistance lama vs MedicineMatcher.
+
+Contoh:
+    python bench_matcher.py --size 3000
+    python bench_matcher.py --csv "Data Obat - 70 Obat.csv"
+    python bench_matcher.py --size 30000 --recall
+"""
+import argparse
+import random
+import time
+
+from matcher import MedicineMatcher, normalize
+
+SYLLABLES = ["pa", "ra", "ce", "ta", "mol", "am", "bro", "xol", "cef", "di", "lo", "fen",
+             "met", "for", "min", "ib", "pro", "ne", "zol", "vi", "ta", "cid", "lin", "sul"]
+VARIANTS = ["", " 500 mg", " 250 mg", " 10 mg", " forte", " sirup", " kaplet", " tablet"]
+# karakter yang sering ketuker di hasil OCR
+OCR_CONFUSION = {"o": "0", "i": "1", "l": "1", "s": "5", "b": "8", "e": "c", "m": "rn", "a": "o"}
+
+
+def synthetic_catalog(size, seed=0):
+    """Katalog palsu: nama brand/generik + variasi dosis/bentuk"""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < size:
+        base = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        names.add(base.capitalize() + rng.choice(VARIANTS))
+    return sorted(names)
+
+
+def ocr_noise(text, rng, rate=0.15):
+    """Simulasi error OCR: ketuker, hilang, atau dobel karakter"""
+    out = []
+    for ch in text:
+        r = rng.random()
+        if r < rate / 2 and ch.lower() in OCR_CONFUSION:
+            out.append(OCR_CONFUSION[ch.lower()])
+        elif r < rate * 3 / 4:
+            continue
+        elif r < rate:
+            out.append(ch + ch)
+        else:
+            out.append(ch)
+    return "".join(out).upper()
+
+
+def load_csv_names(path):
+    import pandas as pd
+    return pd.read_csv(path)["nama_obat"].dropna().astype(str).tolist()
+
+
+def legacy_best(text, daftar_obat):
+    """Loop lama dari camera_loop() checkpoint15-final.py"""
+    import textdistance
+    best_match, score = None, 0
+    for obat in daftar_obat:
+        sim = textdistance.levenshtein.normalized_similarity(text.lower(), obat.lower())
+        sim_score = int(sim * 100)
+        if sim_score > score:
+            best_match, score = obat, sim_score
+    return best_match, score
+
+
+def recall_benchmark(names, texts, truth, limits):
+    """Recall shortlist trigram vs latency, dibanding scan penuh"""
+    t0 = time.perf_counter()
+    indexed = MedicineMatcher(names, index_min_size=0)
+    print(f"Build trigram index: {(time.perf_counter() - t0) * 1000:8.2f} ms")
+    full = MedicineMatcher(names, index_min_size=len(names) + 1)
+
+    t0 = time.perf_counter()
+    exact = [full.best(t) for t in texts]
+    scan_ms = (time.perf_counter() - t0) * 1000 / len(texts)
+    print(f"Scan penuh         : {scan_ms:8.3f} ms/query")
+
+    truth_ids = {n: i for i, n in enumerate(names)}
+    print(f"{'shortlist':>10} {'ms/query':>10} {'recall':>8} {'top1=scan':>10} {'top1 benar':>11}")
+    for limit in limits:
+        indexed.shortlist_size = limit
+        t0 = time.perf_counter()
+        found = [indexed.best(t) for t in texts]
+        ms = (time.perf_counter() - t0) * 1000 / len(texts)
+
+        in_list = sum(
+            1 for t, name in zip(texts, truth)
+            if truth_ids[name] in set(indexed.index.shortlist(normalize(t), limit).tolist())
+        )
+        same = sum(1 for a, b in zip(found, exact) if a[1] == b[1])
+        correct = sum(1 for a, name in zip(found, truth) if a[0] == name)
+        n = len(texts)
+        print(f"{limit:>10} {ms:>10.3f} {in_list / n:>8.1%} {same / n:>10.1%} {correct / n:>11.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", help="CSV katalog (kolom nama_obat), default katalog sintetis")
+    parser.add_argument("--size", type=int, default=3000, help="Ukuran katalog sintetis")
+    parser.add_argument("--queries", type=int, default=200, help="Jumlah teks OCR")
+    parser.add_argument("--legacy-queries", type=int, default=20,
+                        help="Jumlah query untuk loop lama (lambat)")
+    parser.add_argument("--recall", action="store_true",
+                        help="Benchmark recall vs latency shortlist trigram")
+    parser.add_argument("--limits", default="25,50,100,200,500",
+                        help="Ukuran shortlist yang diuji (mode --recall)")
+    args = parser.parse_args()
+
+    names = load_csv_names(args.csv) if args.csv else synthetic_catalog(args.size)
+    rng = random.Random(1)
+    truth = [rng.choice(names) for _ in range(args.queries)]
+    texts = [ocr_noise(t, rng) for t in truth]
+    print(f"📦 Katalog: {len(names)} obat, {len(texts)} query")
+
+    if args.recall:
+        recall_benchmark(names, texts, truth, [int(x) for x in args.limits.split(",")])
+        return
+
+    t0 = time.perf_counter()
+    matcher = MedicineMatcher(names)
+    print(f"Trigram index      : {'ya' if matcher.index is not None else 'tidak'}")
+    print(f"Build matcher      : {(time.perf_counter() - t0) * 1000:8.2f} ms")
+
+    # batch satu frame (~4 ROI) vs semua sekaligus
+    t0 = time.perf_counter()
+    for i in range(0, len(texts), 4):
+        matcher.match_many(texts[i:i + 4])
+    per_query = (time.perf_counter() - t0) * 1000 / len(texts)
+    print(f"Matcher batch=4    : {per_query:8.3f} ms/query")
+
+    t0 = time.perf_counter()
+    results = matcher.match_many(texts)
+    per_query = (time.perf_counter() - t0) * 1000 / len(texts)
+    print(f"Matcher batch=all  : {per_query:8.3f} ms/query")
+
+    correct = sum(1 for r, t in zip(results, truth) if r and r[0][0] == t)
+    print(f"Top-1 benar        : {correct}/{len(texts)}")
+
+    try:
+        n = min(args.legacy_queries, len(texts))
+        t0 = time.perf_counter()
+        legacy = [legacy_best(t, names) for t in texts[:n]]
+        per_query_legacy = (time.perf_counter() - t0) * 1000 / n
+    except ImportError:
+        print("textdistance tidak ter-install, skip loop lama")
+        return
+
+    print(f"Loop textdistance  : {per_query_legacy:8.3f} ms/query")
+    print(f"Speedup            : {per_query_legacy / per_query:8.1f}x")
+    same = sum(1 for a, b in zip(legacy, results) if a[1] == b[0][1])
+    print(f"Score sama         : {same}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Load test OCR: thread di proses utama vs pool proses (ocr_pool.py).
+
+Selama OCR jalan, satu thread "main loop" (pengganti YOLO/Flask/voice)
+terus menghitung iterasi Python murni. Yang diukur:
+  - throughput OCR (job/detik) dan latency submit → hasil
+  - iterasi main loop per detik (berapa banyak GIL yang tersisa)
+
+Default pakai MockReader (kerja Python murni yang pegang GIL, --mock-ms
+per text box). --real pakai EasyOCR asli + crop dari --video.
+
+Contoh:
+    python bench_ocr_pool.py --workers 1 2 3 --jobs 60
+    python bench_ocr_pool.py --real --video ../YOLO/Draft/medicine1.mp4 --workers 2
+"""
+import argparse
+import functools
+import threading
+import time
+
+import numpy as np
+
+from ocr_batch import read_batch
+from ocr_pool import OcrPool, default_reader
+
+
+class MockReader:
+    """Pengganti EasyOCR: tiap text box makan `ms` milidetik CPU sambil pegang GIL"""
+    def __init__(self, ms=20.0):
+        self.ms = ms
+
+    def _burn(self):
+        end = time.perf_counter() + self.ms / 1000.0
+        x = 0
+        while time.perf_counter() < end:
+            x += 1
+        return x
+
+    def readtext(self, roi):
+        return self.recognize(roi, [[0, roi.shape[1], 0, roi.shape[0]]], [])
+
+    def detect(self, batch, reformat=True):
+        return [[[0, b.shape[1], 0, b.shape[0]]] for b in batch], [[] for _ in batch]
+
+    def recognize(self, grey, horizontal_list, free_list, batch_size=1, reformat=True):
+        out = []
+        for x1, x2, y1, y2 in horizontal_list:
+            self._burn()
+            out.append(([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], "PARACETAMOL", 0.9))
+        return out
+
+
+def make_jobs(count, rois_per_job, video=None, seed=0):
+    """List job, tiap job = list ROI (crop dari video kalau ada, selain itu noise)"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    if video:
+        import cv2
+        cap = cv2.VideoCapture(video)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.resize(frame, (640, 480)))
+        cap.release()
+    jobs = []
+    for i in range(count):
+        rois = []
+        for _ in range(rois_per_job):
+            h, w = int(rng.integers(120, 240)), int(rng.integers(160, 320))
+            if frames:
+                frame = frames[i % len(frames)]
+                y, x = int(rng.integers(0, 480 - h)), int(rng.integers(0, 640 - w))
+                rois.append(frame[y:y + h, x:x + w].copy())
+            else:
+                rois.append(rng.integers(0, 255, (h, w, 3), dtype=np.uint8))
+        jobs.append(rois)
+    return jobs
+
+
+class MainLoop:
+    """Thread Python murni, hitung iterasi per detik selama OCR jalan"""
+    def __init__(self):
+        self.count = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while self.running:
+            sum(range(200))
+            self.count += 1
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.thread.join()
+        self.rate = self.count / (time.perf_counter() - self.t0)
+
+
+def run_thread(reader_factory, jobs):
+    reader = reader_factory()
+    read_batch(reader, jobs[0])   # warmup
+    latencies = []
+    with MainLoop() as loop:
+        t0 = time.perf_counter()
+        for rois in jobs:
+            t = time.perf_counter()
+            read_batch(reader, rois)
+            latencies.append((time.perf_counter() - t) * 1000)
+        elapsed = time.perf_counter() - t0
+    return len(jobs) / elapsed, latencies, loop.rate
+
+
+def run_pool(reader_factory, jobs, workers):
+    pool = OcrPool(workers=workers, reader_factory=reader_factory)
+    # maks job in-flight = jumlah slot, supaya load test tidak pernah drop job
+    free = threading.Semaphore(pool.slots)
+    done = threading.Semaphore(0)
+
+    def on_result(frame_id, readings):
+        free.release()
+        done.release()
+
+    pool.on_result = on_result
+    pool.start()
+    while pool.ready < workers:
+        time.sleep(0.05)
+    with MainLoop() as loop:
+        t0 = time.perf_counter()
+        for i, rois in enumerate(jobs):
+            free.acquire()
+            pool.submit(i, [(k, k, roi) for k, roi in enumerate(rois)])
+        for _ in jobs:
+            done.acquire()
+        elapsed = time.perf_counter() - t0
+    stats = pool.stats()
+    pool.stop()
+    return len(jobs) / elapsed, stats, loop.rate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--jobs", type=int, default=60, help="Jumlah frame yang di-OCR")
+    parser.add_argument("--rois", type=int, default=2, help="ROI per frame")
+    parser.add_argument("--mock-ms", type=float, default=20.0, help="CPU ms per text box (MockReader)")
+    parser.add_argument("--real", action="store_true", help="Pakai EasyOCR asli")
+    parser.add_argument("--threads", type=int, default=1, help="Thread torch per worker (--real)")
+    parser.add_argument("--video", default=None, help="Sumber crop (default: noise)")
+    args = parser.parse_args()
+
+    if args.real:
+        factory = functools.partial(default_reader, threads=args.threads)
+    else:
+        factory = functools.partial(MockReader, args.mock_ms)
+    jobs = make_jobs(args.jobs, args.rois, args.video)
+
+    # baseline main loop tanpa OCR
+    with MainLoop() as idle:
+        time.sleep(1.0)
+    print(f"🧪 {args.jobs} frame x {args.rois} ROI, reader={'EasyOCR' if args.real else f'mock {args.mock_ms} ms'}")
+    print(f"Main loop tanpa OCR : {idle.rate:10.0f} iter/detik")
+
+    base, latencies, loop_rate = run_thread(factory, jobs)
+    print(f"Thread (in-process) : {base:6.2f} frame/detik, {np.median(latencies):6.1f} ms/frame, "
+          f"main loop {loop_rate:10.0f} iter/detik ({loop_rate / idle.rate:.0%})")
+    for workers in args.workers:
+        rate, stats, loop_rate = run_pool(factory, jobs, workers)
+        print(f"Pool {workers} worker       : {rate:6.2f} frame/detik ({rate / base:.2f}x), "
+              f"{stats['last_ocr_ms']:6.1f} ms/frame, main loop {loop_rate:10.0f} iter/detik ({loop_rate / idle.rate:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark end-to-end camera pipeline (capture → deteksi → OCR → matching → encode).
+
+Input rekaman diputar ulang lewat VisionPipeline mode lossless (tidak ada
+frame yang di-drop), hasilnya JSON: p50/p95/p99 tiap stage, frame/detik,
+OCR/detik dan peak RSS. Mode --compare membandingkan dengan JSON baseline
+dan exit code 1 kalau ada stage yang lebih lambat melebihi batas.
+
+--mock mengganti YOLO + EasyOCR dengan model palsu (waktu tetap), untuk
+cek harness / overhead pipeline tanpa weights.
+
+Contoh:
+    python bench_pipeline.py --model best_tuned.pt --csv obat.csv --json baseline.json
+    python bench_pipeline.py --model best_tuned.pt --csv obat.csv --json hasil.json --compare baseline.json
+    python bench_pipeline.py --mock --source synthetic --frames 300 --json mock.json
+"""
+import argparse
+import functools
+import json
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+
+from run_headless import add_arguments, build, run
+
+STAGES = ("capture", "detect", "ocr", "match", "annotate")
+
+
+# ===============================
+# Model palsu (--mock)
+# ===============================
+class _Array:
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float32)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class _Boxes:
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy, self.conf, self.cls = _Array(xyxy), _Array(conf), _Array(cls)
+
+
+class _Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class MockDetector:
+    """Pengganti YOLO: tidur `ms` lalu return satu box di tengah frame"""
+    backend = "torch"
+    names = {0: "obat"}
+
+    def __init__(self, ms=60.0):
+        self.ms = ms
+
+    def __call__(self, image, imgsz=640, device="cpu", verbose=False):
+        time.sleep(self.ms / 1000.0)
+        h, w = image.shape[:2]
+        return [_Result(_Boxes([[w * 0.2, h * 0.3, w * 0.8, h * 0.7]], [0.9], [0]))]
+
+
+def build_mock(args, window):
+    from bench_ocr_pool import MockReader
+    from camera import open_source
+    from catalog import CatalogHolder
+    from matcher import MedicineMatcher
+    from ocr_pool import OcrPool
+    from vision import VisionPipeline
+
+    factory = functools.partial(MockReader, args.mock_ocr_ms)
+    ocr_pool = OcrPool(workers=args.ocr_workers, reader_factory=factory).start() if args.ocr_workers > 0 else None
+
+    class Models:
+        model = MockDetector(args.mock_detect_ms)
+
+    if args.csv:
+        holder = CatalogHolder(lambda: args.csv)
+        holder.reload(force=True)
+    else:
+        holder = CatalogHolder(lambda: None)
+        holder.matcher = MedicineMatcher(["Paracetamol", "Amoxicillin", "Ibuprofen"])
+
+    if ocr_pool is not None:
+        while ocr_pool.ready < ocr_pool.workers:
+            time.sleep(0.05)
+    source = open_source(args.source, loop=False)
+    vision = VisionPipeline(source, Models(), holder, reader=factory() if ocr_pool is None else None, ocr_pool=ocr_pool,
+                            lossless=True, encode=not args.no_encode, max_frames=args.frames, window=window)
+    vision.adaptive_enabled = lambda: args.adaptive
+    return vision, ocr_pool
+
+
+# ===============================
+# Report + compare
+# ===============================
+def peak_rss_mb():
+    """Peak RSS proses ini + worker (anak yang sudah selesai), Linux ru_maxrss dalam KB"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024.0
+    return round(own, 1), round(children, 1)
+
+
+def make_report(stats, elapsed, args):
+    rss, rss_children = peak_rss_mb()
+    stages = {}
+    for name in STAGES:
+        s = stats[name]
+        stages[name] = {
+            "count": s["processed"],
+            "mean_ms": s["avg_ms"],
+            "p50_ms": s["p50_ms"],
+            "p95_ms": s["p95_ms"],
+            "p99_ms": s["p99_ms"],
+            "max_ms": s["max_ms"],
+            "dropped": s["dropped"],
+        }
+    pool = stats["ocr_pool"]
+    if pool:
+        # dengan pool, stage "ocr" cuma submit; latency OCR sebenarnya = submit → hasil
+        stages["ocr_pool"] = {
+            "count": pool["completed"], "mean_ms": pool["avg_ms"], "p50_ms": pool["p50_ms"],
+            "p95_ms": pool["p95_ms"], "p99_ms": pool["p99_ms"], "max_ms": None, "dropped": pool["dropped"],
+        }
+    return {
+        "source": args.source,
+        "frames": stats["frames"],
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(stats["frames"] / elapsed, 3) if elapsed else 0.0,
+        "ocr_calls_per_s": round(stats["ocr_jobs"] / elapsed, 3) if elapsed else 0.0,
+        "ocr_rois_per_s": round(stats["ocr_rois"] / elapsed, 3) if elapsed else 0.0,
+        "peak_rss_mb": rss,
+        "peak_rss_workers_mb": rss_children,
+        "stages": stages,
+        "config": {
+            "mock": args.mock, "backend": args.backend, "adaptive": args.adaptive,
+            "ocr_workers": args.ocr_workers, "encode": not args.no_encode,
+            "python": platform.python_version(), "machine": platform.machine(),
+        },
+    }
+
+
+def compare(base, new, metric="p95_ms", threshold=0.10, min_ms=1.0):
+    """List regresi: stage yang `metric`-nya naik > threshold (dan > min_ms absolut), atau fps turun"""
+    regressions = []
+    print(f"{'stage':<10}{'baseline':>12}{'sekarang':>12}{'delta':>10}")
+    for name, s in new["stages"].items():
+        old = base["stages"].get(name, {}).get(metric)
+        cur = s[metric]
+        if old is None:
+            continue
+        change = (cur - old) / old if old else 0.0
+        flag = ""
+        if cur - old > min_ms and change > threshold:
+            regressions.append(f"{name} {metric} {old:.2f} → {cur:.2f} ms ({change:+.1%})")
+            flag = "  ❌"
+        print(f"{name:<10}{old:>12.2f}{cur:>12.2f}{change:>+10.1%}{flag}")
+
+    fps_change = (new["fps"] - base["fps"]) / base["fps"] if base["fps"] else 0.0
+    print(f"{'fps':<10}{base['fps']:>12.2f}{new['fps']:>12.2f}{fps_change:>+10.1%}")
+    if fps_change < -threshold:
+        regressions.append(f"fps {base['fps']:.2f} → {new['fps']:.2f} ({fps_change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_arguments(parser, require_model=False)
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    parser.add_argument("--compare", help="JSON baseline untuk dibandingkan")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    parser.add_argument("--threshold", type=float, default=0.10, help="Batas regresi relatif (0.10 = 10%%)")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="Selisih absolut minimum supaya dihitung regresi")
+    parser.add_argument("--window", type=int, default=100000, help="Jumlah sampel latency per stage")
+    parser.add_argument("--mock", action="store_true", help="YOLO + EasyOCR palsu (tanpa weights)")
+    parser.add_argument("--mock-detect-ms", type=float, default=60.0)
+    parser.add_argument("--mock-ocr-ms", type=float, default=150.0)
+    args = parser.parse_args()
+    if not args.mock and not (args.model and args.csv):
+        parser.error("--model dan --csv wajib (kecuali --mock)")
+    args.realtime = False
+
+    if args.mock:
+        vision, ocr_pool = build_mock(args, args.window)
+    else:
+        vision, _, ocr_pool, _ = build(args, window=args.window)
+    stats, elapsed = run(vision, ocr_pool)
+    report = make_report(stats, elapsed, args)
+
+    print(f"🎞️ {report['frames']} frame dari {args.source}: {report['fps']:.2f} fps, "
+          f"OCR {report['ocr_calls_per_s']:.2f} panggilan/detik, peak RSS {report['peak_rss_mb']} MB "
+          f"(+ worker {report['peak_rss_workers_mb']} MB)")
+    print(f"{'stage':<10}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, s in report["stages"].items():
+        print(f"{name:<10}{s['count']:>7}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+              f"{s['max_ms'] if s['max_ms'] is not None else float('nan'):>10.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+        regressions = compare(base, report, args.metric, args.threshold, args.min_ms)
+        if regressions:
+            print("❌ REGRESI:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("✅ Tidak ada regresi")
+
+
+if __name__ == "__main__":
+    main()
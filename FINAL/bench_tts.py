@@ -0,0 +1,180 @@
+"""
+Benchmark jalur TTS lama (file sementara + pydub) vs jalur memori (tts.py).
+
+Sintesis gTTS (jaringan) sama untuk dua jalur, jadi audio dibuat sekali lalu
+yang diukur hanya bagian setelahnya, per kalimat:
+  - lama  : tulis temp.mp3 → pydub decode → set_frame_rate → export WAV ke
+            file → baca file (seperti mixer.music.load) → hapus dua file
+  - memori: MP3 bytes → satu pipe ffmpeg (decode + resample) → WAV bytes
+
+--dir menentukan tempat file sementara jalur lama; jalankan di SD card Pi
+supaya angkanya sama dengan kondisi asli.
+
+--stream membandingkan time-to-first-audio jawaban panjang: synthesize semua
+lalu putar vs per kalimat (speech_stream.py). Speaker tidak dipakai, play
+disimulasikan dengan sleep sepanjang durasi audio (x --play-scale).
+
+Contoh:
+    python bench_tts.py --text "Paracetamol adalah obat penurun demam." --runs 20
+    python bench_tts.py --mp3 contoh.mp3 --runs 50 --dir /home/pi
+    python bench_tts.py --mock --runs 50        # WAV palsu, resample NumPy (tanpa gTTS / ffmpeg)
+    python bench_tts.py --stream --runs 3
+    python bench_tts.py --stream --mock --play-scale 0.1
+"""
+import argparse
+import os
+import time
+
+import tts
+from pipeline import percentile
+from speech_stream import SpeechStream, split_sentences
+
+LONG_TEXT = (
+    "Paracetamol adalah obat untuk menurunkan demam dan meredakan nyeri ringan hingga sedang, "
+    "seperti sakit kepala dan sakit gigi. Dosis dewasa 500 sampai 1.000 mg, diminum tiga sampai "
+    "empat kali sehari dengan jarak minimal 4 jam. Jangan melebihi 4.000 mg dalam sehari. "
+    "Efek samping jarang terjadi, namun bisa berupa mual atau ruam kulit. Hindari penggunaan "
+    "bersama alkohol karena dapat membebani hati. Bila demam tidak turun setelah tiga hari, "
+    "segera konsultasikan ke dokter atau apoteker."
+)
+
+
+def old_path(data, fmt, directory):
+    from pydub import AudioSegment
+    src = os.path.join(directory, f"temp.{fmt}")
+    dst = os.path.join(directory, f"temp_audio_{int(time.time())}.wav")
+    with open(src, "wb") as f:
+        f.write(data)
+    sound = AudioSegment.from_file(src, format=fmt)
+    sound = sound.set_frame_rate(tts.RATE)
+    sound.export(dst, format="wav")
+    os.remove(src)
+    with open(dst, "rb") as f:
+        wav = f.read()
+    os.remove(dst)
+    return wav
+
+
+def memory_path(data, fmt):
+    if fmt == "wav":
+        pcm, rate = tts.read_wav(data)
+        return tts.to_wav(tts.resample(pcm, rate, tts.RATE), tts.RATE)
+    return tts.to_wav(tts.decode(data, tts.RATE), tts.RATE)
+
+
+def measure(func, runs):
+    func()  # warmup (cache disk / import)
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": sum(samples) / len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+    }
+
+
+# ===============================
+# --stream: time-to-first-audio
+# ===============================
+def fake_play(audio, scale):
+    pcm, rate = tts.read_wav(audio)
+    time.sleep(len(pcm) / float(rate) * scale)
+
+
+def run_full(text, synthesize, play):
+    """Jalur lama text2speech_play: synthesize semua, baru putar"""
+    t0 = time.perf_counter()
+    audio = synthesize(text)
+    first_ms = (time.perf_counter() - t0) * 1000
+    play(audio)
+    return first_ms, (time.perf_counter() - t0) * 1000
+
+
+def run_stream(text, synthesize, play, maxsize):
+    speech = SpeechStream(synthesize, play, maxsize=maxsize)
+    _, stats = speech.speak(text)
+    return stats["first_audio_ms"], stats["total_ms"]
+
+
+def bench_stream(args):
+    text = args.text or LONG_TEXT
+    if args.mock:
+        from audio_bank import mock_tts
+
+        def synthesize(chunk):
+            # latency gTTS ~ ongkos tetap request + panjang teks
+            time.sleep((args.mock_base_ms + args.mock_char_ms * len(chunk)) / 1000.0)
+            return mock_tts(chunk)[0]
+    else:
+        synthesize = tts.tts_wav
+    play = lambda audio: fake_play(audio, args.play_scale)
+
+    print(f"Teks {len(text)} karakter, {len(split_sentences(text))} kalimat, {args.runs} kali")
+    results = {"penuh": [], "stream": []}
+    for _ in range(args.runs):
+        results["penuh"].append(run_full(text, synthesize, play))
+        results["stream"].append(run_stream(text, synthesize, play, args.maxsize))
+
+    print(f"{'mode':<8}{'first audio':>14}{'total':>12}")
+    means = {}
+    for name, runs in results.items():
+        first = sum(r[0] for r in runs) / len(runs)
+        total = sum(r[1] for r in runs) / len(runs)
+        means[name] = first
+        print(f"{name:<8}{first:>11.0f} ms{total:>9.0f} ms")
+    print(f"✅ Suara pertama {means['penuh'] - means['stream']:.0f} ms lebih cepat "
+          f"({means['penuh'] / means['stream']:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--text", default=None)
+    parser.add_argument("--mp3", help="Pakai file MP3 ini (hasil gTTS), bukan sintesis baru")
+    parser.add_argument("--mock", action="store_true", help="WAV palsu dari audio_bank.mock_tts")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--dir", default=".", help="Folder file sementara jalur lama")
+    parser.add_argument("--stream", action="store_true", help="Time-to-first-audio penuh vs per kalimat")
+    parser.add_argument("--maxsize", type=int, default=2, help="Antrian kalimat --stream")
+    parser.add_argument("--play-scale", type=float, default=1.0, help="Pengali durasi play palsu --stream")
+    parser.add_argument("--mock-base-ms", type=float, default=400.0, help="Latency TTS palsu per request")
+    parser.add_argument("--mock-char-ms", type=float, default=3.0, help="Latency TTS palsu per karakter")
+    args = parser.parse_args()
+    if args.stream:
+        bench_stream(args)
+        return
+    text = args.text or "Paracetamol adalah obat untuk menurunkan demam dan meredakan nyeri ringan."
+
+    if args.mock:
+        from audio_bank import mock_tts
+        data, fmt = mock_tts(text)
+    elif args.mp3:
+        with open(args.mp3, "rb") as f:
+            data, fmt = f.read(), "mp3"
+    else:
+        t0 = time.perf_counter()
+        data, fmt = tts.synthesize_mp3(text), "mp3"
+        print(f"gTTS: {(time.perf_counter() - t0) * 1000:.0f} ms (sama untuk dua jalur, tidak dihitung)")
+    print(f"Audio input: {len(data) / 1024:.1f} KB {fmt}, {args.runs} kali")
+
+    new = measure(lambda: memory_path(data, fmt), args.runs)
+    try:
+        old = measure(lambda: old_path(data, fmt, args.dir), args.runs)
+    except ImportError:
+        old = None
+        print("⚠️ pydub tidak ada, jalur lama dilewati")
+
+    print(f"{'jalur':<8}{'mean':>10}{'p50':>10}{'p95':>10}")
+    for name, s in (("lama", old), ("memori", new)):
+        if s:
+            print(f"{name:<8}{s['mean_ms']:>10.2f}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}")
+    if old:
+        print(f"✅ Hemat {old['p50_ms'] - new['p50_ms']:.1f} ms per kalimat (p50), "
+              f"{old['p50_ms'] / new['p50_ms']:.1f}x lebih cepat")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Broadcaster frame JPEG untuk /video_feed.
+
+Satu producer (stage annotate) publish frame, tiap client menunggu frame
+baru lewat condition variable + nomor urut (seq). Client yang lambat tidak
+di-buffer: dia langsung lompat ke frame terbaru dan frame yang terlewat
+dihitung sebagai drop.
+"""
+import itertools
+import threading
+import time
+
+
+class FrameBroadcaster:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._clients = {}
+        self._ids = itertools.count(1)
+
+    def publish(self, frame):
+        """Dipanggil producer tiap ada frame JPEG baru"""
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def wait_next(self, last_seq, timeout=1.0):
+        """Tunggu frame dengan seq > last_seq. Return (seq, frame), frame None kalau timeout"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != last_seq, timeout):
+                return last_seq, None
+            return self._seq, self._frame
+
+    def subscribe(self, name="client", max_fps=None):
+        """
+        Generator frame untuk satu client.
+
+        Hanya frame baru yang dikirim. max_fps (opsional) membatasi kecepatan
+        kirim per client, frame di antaranya ikut dihitung drop.
+        """
+        client_id = next(self._ids)
+        info = {"name": name, "since": time.time(), "sent": 0, "dropped": 0, "max_fps": max_fps}
+        with self._cond:
+            self._clients[client_id] = info
+
+        min_interval = 1.0 / max_fps if max_fps else 0
+        last_seq = 0
+        try:
+            while True:
+                seq, frame = self.wait_next(last_seq)
+                if frame is None:
+                    continue
+                if last_seq:
+                    info["dropped"] += seq - last_seq - 1
+                last_seq = seq
+
+                t0 = time.time()
+                yield frame
+                info["sent"] += 1
+
+                if min_interval:
+                    remaining = min_interval - (time.time() - t0)
+                    if remaining > 0:
+                        time.sleep(remaining)
+        finally:
+            # dipanggil saat client disconnect (generator di-close Flask)
+            with self._cond:
+                self._clients.pop(client_id, None)
+
+    def stats(self):
+        with self._cond:
+            clients = {str(cid): dict(info) for cid, info in self._clients.items()}
+            seq = self._seq
+        return {"seq": seq, "client_count": len(clients), "clients": clients}
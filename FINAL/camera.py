@@ -0,0 +1,281 @@
+"""
+Sumber frame untuk camera pipeline (FrameSource).
+
+Semua sumber punya interface yang sama: read(out) menulis frame lores BGR
+(default 640x480) ke `out` (slot frame ring) dan return handle HighRes
+(crop() + release()) untuk crop OCR resolusi tinggi, atau None kalau
+sumber habis. Box di koordinat lores dipetakan ke resolusi tinggi dengan
+skala per sumbu.
+
+  - PicameraSource  : Picamera2 dual-stream. lores (YUV420) untuk deteksi,
+                      main (1640x1232 RGB888) tidak di-copy per frame; request
+                      dipegang sampai detect selesai ambil crop OCR
+  - UsbSource       : kamera V4L2 / USB (cv2.VideoCapture)
+  - VideoSource     : replay file video (kamera palsu, bisa realtime / secepatnya)
+  - FolderSource    : folder gambar (atau satu file gambar)
+  - SyntheticSource : frame buatan berisi kotak obat bergerak, tanpa file apa pun
+
+open_source(spec) memilih sumber dari string seperti di yolo_detect.py:
+"picamera0", "usb0", "synthetic", path folder, path video / gambar.
+"""
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+MAIN_SIZE = (1640, 1232)    # mode 2x2 binning kamera v2, FoV penuh
+LORES_SIZE = (640, 480)
+MAX_CROP_SIDE = 960         # crop OCR lebih besar dari ini di-resize turun
+
+IMG_EXT_LIST = ['.jpg', '.jpeg', '.png', '.bmp']
+VID_EXT_LIST = ['.avi', '.mov', '.mp4', '.mkv', '.wmv']
+
+
+def map_box(box, scale):
+    """Box (x1, y1, x2, y2) koordinat lores → koordinat main"""
+    sx, sy = scale
+    x1, y1, x2, y2 = box[:4]
+    return int(x1 * sx), int(y1 * sy), int(np.ceil(x2 * sx)), int(np.ceil(y2 * sy))
+
+
+def limit_side(image, max_side=MAX_CROP_SIDE):
+    h, w = image.shape[:2]
+    if max(h, w) <= max_side:
+        return image
+    ratio = max_side / float(max(h, w))
+    return cv2.resize(image, (max(1, int(w * ratio)), max(1, int(h * ratio))), interpolation=cv2.INTER_AREA)
+
+
+class ArrayHighRes:
+    """Frame resolusi tinggi yang sudah ada di memori (sumber selain Picamera2)"""
+    def __init__(self, image, scale):
+        self.image = image
+        self.scale = scale
+
+    def crop(self, box, max_side=MAX_CROP_SIDE):
+        x1, y1, x2, y2 = map_box(box, self.scale)
+        return limit_side(self.image[y1:y2, x1:x2].copy(), max_side)
+
+    def release(self):
+        self.image = None
+
+
+class RequestHighRes:
+    """Request Picamera2 yang masih dipegang, crop diambil dari stream main"""
+    def __init__(self, request, scale):
+        self.request = request
+        self.scale = scale
+
+    def crop(self, box, max_side=MAX_CROP_SIDE):
+        from picamera2 import MappedArray
+        x1, y1, x2, y2 = map_box(box, self.scale)
+        with MappedArray(self.request, "main") as m:
+            roi = m.array[y1:y2, x1:x2, :3].copy()
+        return limit_side(roi, max_side)
+
+    def release(self):
+        # buffer harus cepat kembali ke libcamera, kalau tidak kamera drop frame
+        if self.request is not None:
+            self.request.release()
+            self.request = None
+
+
+class FrameSource:
+    """Interface sumber frame untuk camera pipeline"""
+    main_size = LORES_SIZE
+    lores_size = LORES_SIZE
+
+    @property
+    def scale(self):
+        return (self.main_size[0] / float(self.lores_size[0]), self.main_size[1] / float(self.lores_size[1]))
+
+    def start(self):
+        return self
+
+    def read(self, out):
+        """Tulis frame lores BGR ke `out`, return handle HighRes atau None kalau habis"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _from_main(self, main, out):
+        """Frame resolusi tinggi di memori → lores ke `out` + handle HighRes"""
+        h, w = main.shape[:2]
+        cv2.resize(main, self.lores_size, dst=out, interpolation=cv2.INTER_AREA)
+        return ArrayHighRes(main, (w / float(self.lores_size[0]), h / float(self.lores_size[1])))
+
+
+class PicameraSource(FrameSource):
+    def __init__(self, main_size=MAIN_SIZE, lores_size=LORES_SIZE, buffer_count=6):
+        from picamera2 import Picamera2
+        self.main_size = tuple(main_size)
+        self.lores_size = tuple(lores_size)
+        self.picam2 = Picamera2()
+        # lores di Pi 4 wajib YUV420; request dipegang sampai detect selesai,
+        # jadi buffer dilebihkan supaya kamera tidak kehabisan buffer
+        self.picam2.configure(self.picam2.create_preview_configuration(
+            main={"format": "RGB888", "size": self.main_size},
+            lores={"format": "YUV420", "size": self.lores_size},
+            buffer_count=buffer_count,
+        ))
+
+    def start(self):
+        self.picam2.start()
+        return self
+
+    def read(self, out):
+        from picamera2 import MappedArray
+        request = self.picam2.capture_request()
+        try:
+            with MappedArray(request, "lores") as m:
+                w, h = self.lores_size
+                # YUV420 planar (h * 3/2 baris) → BGR langsung ke slot, tanpa alokasi
+                cv2.cvtColor(m.array[:h * 3 // 2, :w], cv2.COLOR_YUV420p2BGR, dst=out)
+        except Exception:
+            request.release()
+            raise
+        return RequestHighRes(request, self.scale)
+
+    def close(self):
+        self.picam2.stop()
+
+
+class UsbSource(FrameSource):
+    """Kamera USB / V4L2, main = resolusi yang benar-benar diberikan kamera"""
+    def __init__(self, index=0, main_size=(1280, 720), lores_size=LORES_SIZE):
+        self.lores_size = tuple(lores_size)
+        self.cap = cv2.VideoCapture(index, cv2.CAP_V4L2)
+        if not self.cap.isOpened():
+            raise IOError(f"Kamera USB {index} tidak bisa dibuka")
+        # MJPG supaya resolusi tinggi tetap dapat fps wajar di USB 2.0
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, main_size[0])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, main_size[1])
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.main_size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    def read(self, out):
+        ret, frame = self.cap.read()
+        if not ret:
+            raise IOError("Gagal baca frame kamera USB")
+        return self._from_main(frame, out)
+
+    def close(self):
+        self.cap.release()
+
+
+class VideoSource(FrameSource):
+    """Kamera palsu: putar file video, main = frame di-resize ke main_size"""
+    def __init__(self, path, main_size=MAIN_SIZE, lores_size=LORES_SIZE, loop=True, realtime=False):
+        self.path = path
+        self.main_size = tuple(main_size)
+        self.lores_size = tuple(lores_size)
+        self.loop = loop
+        self.realtime = realtime
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Video {path} tidak bisa dibuka")
+        self.interval = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self.last = 0.0
+
+    def read(self, out):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return None
+        if self.realtime:
+            # tahan ke fps asli video, seperti kamera sungguhan
+            wait = self.interval - (time.perf_counter() - self.last)
+            if wait > 0:
+                time.sleep(wait)
+            self.last = time.perf_counter()
+        main = cv2.resize(frame, self.main_size, interpolation=cv2.INTER_AREA)
+        return self._from_main(main, out)
+
+    def close(self):
+        self.cap.release()
+
+
+class FolderSource(FrameSource):
+    """Gambar dalam folder (urut nama), main = gambar ukuran asli"""
+    def __init__(self, path, lores_size=LORES_SIZE, loop=False):
+        self.lores_size = tuple(lores_size)
+        self.loop = loop
+        if os.path.isdir(path):
+            files = sorted(glob.glob(os.path.join(path, "*")))
+            self.files = [f for f in files if os.path.splitext(f)[1].lower() in IMG_EXT_LIST]
+        else:
+            self.files = [path]
+        if not self.files:
+            raise IOError(f"Tidak ada gambar di {path}")
+        self.index = 0
+
+    def read(self, out):
+        while True:
+            if self.index >= len(self.files):
+                if not self.loop:
+                    return None
+                self.index = 0
+            path = self.files[self.index]
+            self.index += 1
+            image = cv2.imread(path)
+            if image is not None:
+                return self._from_main(image, out)
+            print(f"⚠️ Gagal baca gambar {path}")
+
+
+class SyntheticSource(FrameSource):
+    """Frame buatan: kotak obat bertuliskan nama obat bergerak di atas background noise"""
+    def __init__(self, names=("PARACETAMOL", "AMOXICILLIN", "IBUPROFEN"), frames=None,
+                 main_size=MAIN_SIZE, lores_size=LORES_SIZE, seed=0):
+        self.names = list(names)
+        self.frames = frames
+        self.main_size = tuple(main_size)
+        self.lores_size = tuple(lores_size)
+        rng = np.random.default_rng(seed)
+        w, h = self.main_size
+        self.background = cv2.GaussianBlur(rng.integers(60, 140, (h, w, 3), dtype=np.uint8), (0, 0), 5)
+        self.count = 0
+
+    def read(self, out):
+        if self.frames is not None and self.count >= self.frames:
+            return None
+        w, h = self.main_size
+        main = self.background.copy()
+        # satu obat per ~120 frame, kotak bergerak pelan kiri → kanan
+        name = self.names[(self.count // 120) % len(self.names)]
+        t = (self.count % 120) / 120.0
+        bw, bh = w // 3, h // 3
+        x1 = int(w * 0.1 + t * (w * 0.8 - bw))
+        y1 = int(h / 2 - bh / 2 + np.sin(t * np.pi * 2) * h * 0.05)
+        cv2.rectangle(main, (x1, y1), (x1 + bw, y1 + bh), (235, 235, 235), -1)
+        scale = bw / 330.0
+        cv2.putText(main, name, (x1 + bw // 12, y1 + bh // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                    scale, (30, 30, 160), max(1, int(scale * 2.5)))
+        cv2.putText(main, "500 mg", (x1 + bw // 12, y1 + bh * 3 // 4), cv2.FONT_HERSHEY_SIMPLEX,
+                    scale * 0.8, (30, 30, 30), max(1, int(scale * 2)))
+        self.count += 1
+        return self._from_main(main, out)
+
+
+def open_source(spec, main_size=None, lores_size=LORES_SIZE, loop=False, realtime=False):
+    """String sumber → FrameSource ("picamera0", "usb0", "synthetic", folder, video, gambar)"""
+    if spec.startswith("picamera"):
+        return PicameraSource(main_size or MAIN_SIZE, lores_size)
+    if spec.startswith("usb"):
+        return UsbSource(int(spec[3:] or 0), main_size or (1280, 720), lores_size)
+    if spec == "synthetic":
+        return SyntheticSource(main_size=main_size or MAIN_SIZE, lores_size=lores_size)
+    if os.path.isdir(spec):
+        return FolderSource(spec, lores_size, loop=loop)
+    ext = os.path.splitext(spec)[1].lower()
+    if ext in VID_EXT_LIST:
+        return VideoSource(spec, main_size or MAIN_SIZE, lores_size, loop=loop, realtime=realtime)
+    if ext in IMG_EXT_LIST:
+        return FolderSource(spec, lores_size, loop=loop)
+    raise ValueError(f"Sumber frame tidak dikenal: {spec}")
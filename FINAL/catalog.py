@@ -0,0 +1,242 @@
+"""
+Katalog obat ter-compile (.vmcat) yang di-mmap saat runtime.
+
+CSV obat di-compile sekali jadi file biner berisi:
+  - string table nama asli + nama ter-normalize (blob UTF-8 + offsets)
+  - TrigramIndex (daftar trigram, offsets, postings, jumlah trigram per nama)
+Header menyimpan SHA-256 dari CSV sumber. Kalau CSV berubah, file otomatis
+di-compile ulang. Runtime tidak perlu import pandas sama sekali.
+
+CatalogHolder memegang matcher aktif dan me-reload katalog di background
+kalau CSV berubah, tanpa restart.
+
+Compile manual:
+    python catalog.py "Data Obat - 70 Obat.csv"
+"""
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from matcher import MedicineMatcher, normalize
+from ngram_index import TrigramIndex
+
+MAGIC = b"VMCAT\x00\x01\x00"
+# magic, sha256 CSV, jumlah nama, jumlah trigram, jumlah section
+HEADER = struct.Struct("<8s32sIII")
+SECTION = struct.Struct("<QQ")   # offset, nbytes
+SECTIONS = ["names_blob", "names_offsets", "keys_blob", "keys_offsets",
+            "grams_blob", "grams_offsets", "index_offsets", "postings", "gram_counts"]
+DTYPES = {
+    "names_blob": np.uint8, "names_offsets": np.int64,
+    "keys_blob": np.uint8, "keys_offsets": np.int64,
+    "grams_blob": np.uint8, "grams_offsets": np.int64,
+    "index_offsets": np.int64, "postings": np.int32, "gram_counts": np.int32,
+}
+
+
+class Catalog:
+    def __init__(self, names, keys, index, source=None, checksum=None):
+        self.names = names
+        self.keys = keys
+        self.index = index
+        self.source = source
+        self.checksum = checksum
+
+    def __len__(self):
+        return len(self.names)
+
+
+def file_checksum(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def read_csv_names(path, column="nama_obat"):
+    """Kolom nama_obat tanpa pandas (baris kosong dibuang seperti dropna)"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        if column not in (reader.fieldnames or []):
+            raise KeyError(f"Kolom '{column}' tidak ada di {path}")
+        return [row[column].strip() for row in reader if (row[column] or "").strip()]
+
+
+def default_cache_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".vmcat"
+
+
+def _string_table(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_table(blob, offsets):
+    raw = blob.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def compile_catalog(csv_path, out_path=None):
+    """CSV → file .vmcat. Ditulis ke file sementara lalu os.replace (atomic)"""
+    out_path = out_path or default_cache_path(csv_path)
+    checksum = file_checksum(csv_path)
+    names = read_csv_names(csv_path)
+    keys = [normalize(n) for n in names]
+    index = TrigramIndex.build(keys)
+
+    arrays = {}
+    arrays["names_blob"], arrays["names_offsets"] = _string_table(names)
+    arrays["keys_blob"], arrays["keys_offsets"] = _string_table(keys)
+    arrays["grams_blob"], arrays["grams_offsets"] = _string_table(index.grams)
+    arrays["index_offsets"] = index.offsets
+    arrays["postings"] = index.postings
+    arrays["gram_counts"] = index.gram_counts
+
+    # tiap section di-align 8 byte supaya np.frombuffer bisa langsung view
+    pos = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    for name in SECTIONS:
+        pos = (pos + 7) & ~7
+        nbytes = arrays[name].nbytes
+        table.append((pos, nbytes))
+        pos += nbytes
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, checksum, len(names), len(index.grams), len(SECTIONS)))
+        for offset, nbytes in table:
+            f.write(SECTION.pack(offset, nbytes))
+        for name, (offset, _) in zip(SECTIONS, table):
+            f.write(b"\x00" * (offset - f.tell()))
+            f.write(np.ascontiguousarray(arrays[name], dtype=DTYPES[name]).tobytes())
+    os.replace(tmp_path, out_path)
+    print(f"📦 Compile katalog: {len(names)} obat, {len(index.grams)} trigram → {out_path}")
+    return out_path
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic, checksum, n_names, n_grams, n_sections = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or n_sections != len(SECTIONS):
+        return None
+    return checksum
+
+
+def open_catalog(path, source=None):
+    """mmap file .vmcat. Array index tetap di page cache, tidak di-copy"""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, checksum, n_names, n_grams, n_sections = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or n_sections != len(SECTIONS):
+        raise ValueError(f"Bukan file katalog VISMED: {path}")
+
+    arrays = {}
+    for i, name in enumerate(SECTIONS):
+        offset, nbytes = SECTION.unpack_from(mm, HEADER.size + i * SECTION.size)
+        dtype = np.dtype(DTYPES[name])
+        arrays[name] = np.frombuffer(mm, dtype=dtype, count=nbytes // dtype.itemsize, offset=offset)
+
+    names = _decode_table(arrays["names_blob"], arrays["names_offsets"])
+    keys = _decode_table(arrays["keys_blob"], arrays["keys_offsets"])
+    grams = _decode_table(arrays["grams_blob"], arrays["grams_offsets"])
+    index = TrigramIndex(grams, arrays["index_offsets"], arrays["postings"], arrays["gram_counts"])
+    return Catalog(names, keys, index, source=source, checksum=checksum)
+
+
+def load_catalog(csv_path, cache_path=None):
+    """Load katalog dari cache .vmcat, compile ulang kalau CSV sudah berubah"""
+    cache_path = cache_path or default_cache_path(csv_path)
+    checksum = file_checksum(csv_path)
+    if not os.path.exists(cache_path) or read_header(cache_path) != checksum:
+        compile_catalog(csv_path, cache_path)
+    return open_catalog(cache_path, source=csv_path)
+
+
+class CatalogHolder:
+    """
+    Matcher aktif + hot reload.
+
+    Thread watcher cek mtime/size CSV tiap `interval` detik. Matcher baru
+    dibangun penuh di thread itu, baru kemudian referensinya di-swap, jadi
+    pembaca `holder.matcher` tidak pernah melihat index setengah jadi.
+    """
+
+    def __init__(self, path_fn, interval=2.0):
+        self.path_fn = path_fn          # callable → path CSV saat ini (bisa berubah lewat .env)
+        self.interval = interval
+        self.matcher = MedicineMatcher([])
+        self.reloads = 0
+        self.last_reload_ms = 0.0
+        self.loaded_at = None
+        self.last_error = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_signature(path):
+        st = os.stat(path)
+        return path, st.st_mtime_ns, st.st_size
+
+    def reload(self, force=False):
+        """Rebuild matcher kalau CSV berubah. Return True kalau terjadi swap"""
+        with self._lock:
+            path = self.path_fn()
+            signature = self._file_signature(path)
+            if not force and signature == self._signature:
+                return False
+
+            t0 = time.perf_counter()
+            catalog = load_catalog(path)
+            matcher = MedicineMatcher.from_catalog(catalog)
+            self.matcher = matcher   # swap atomic (satu assignment referensi)
+
+            self._signature = signature
+            self.reloads += 1
+            self.last_reload_ms = (time.perf_counter() - t0) * 1000
+            self.loaded_at = time.time()
+            self.last_error = None
+            print(f"📦 Katalog aktif: {len(matcher)} obat dari {path} ({self.last_reload_ms:.0f} ms)")
+            return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload()
+            except Exception as e:
+                # katalog lama tetap dipakai
+                if str(e) != self.last_error:
+                    print(f"⚠️ Gagal reload katalog: {e}")
+                self.last_error = str(e)
+
+    def start(self):
+        threading.Thread(target=self._watch, name="catalog-watch", daemon=True).start()
+
+    def stats(self):
+        return {
+            "path": self._signature[0] if self._signature else None,
+            "entries": len(self.matcher),
+            "indexed": self.matcher.index is not None,
+            "reloads": self.reloads,
+            "last_reload_ms": round(self.last_reload_ms, 2),
+            "loaded_at": self.loaded_at,
+            "last_error": self.last_error,
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python catalog.py <obat.csv> [output.vmcat]")
+        sys.exit(1)
+    compile_catalog(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
@@ -2,92 +2,111 @@
 # IMPORTS
 # ===============================
 from flask import Flask, Response, request, jsonify, abort
-import cv2
-from ultralytics import YOLO
 import easyocr
 import torch
-import pandas as pd
-import textdistance   # 🔄 ganti rapidfuzz dengan textdistance
-from picamera2 import Picamera2
 import os
-from dotenv import load_dotenv
 import time
 import re
 import threading
-import requests
+
+from pipeline import Stage
+from broadcaster import FrameBroadcaster
+from catalog import CatalogHolder
+from config import ConfigService
+from model_manager import ModelManager
+from detector import load_detector
+from ocr_pool import OcrPool
+from camera import PicameraSource
+from vision import VisionPipeline
+from metrics import REGISTRY, cpu_temperature, throttled
+from webhook import WebhookClient
+from response_cache import ResponseCache
+from audio_bank import AudioBank
+from tts import join_wav, tts_wav
+from speech_stream import SpeechStream
 
 # Voice Assistant deps
 import speech_recognition as sr
-from gtts import gTTS
-from pydub import AudioSegment
 from pygame import mixer
 import vlc
 from datetime import date
+from io import BytesIO
 
 # Raspberry GPIO
 import RPi.GPIO as GPIO
 
 # ===============================
 # LOAD ENV + AUTO REFRESH
-# ===============================
-def load_env_vars():
-    """Load environment variables dari .env"""
-    load_dotenv(override=True)
-    globals()["API_TOKEN"] = os.getenv("API_TOKEN")
-    globals()["YOLO_MODEL"] = os.getenv("YOLO_MODEL")
-    globals()["OBAT_CSV"] = os.getenv("OBAT_CSV")
-    globals()["WEBHOOK_NORMAL"] = os.getenv("WEBHOOK_NORMAL")
-    globals()["WEBHOOK_REMINDER"] = os.getenv("WEBHOOK_REMINDER")
-
-    print("🔄 ENV Reloaded:")
-    print(f"   API_TOKEN={API_TOKEN}")
-    print(f"   YOLO_MODEL={YOLO_MODEL}")
-    print(f"   OBAT_CSV={OBAT_CSV}")
-    print(f"   WEBHOOK_NORMAL={WEBHOOK_NORMAL}")
-    print(f"   WEBHOOK_REMINDER={WEBHOOK_REMINDER}")
-
-# first load
-load_env_vars()
-
-# refresher thread
-def env_refresher():
-    while True:
-        time.sleep(30)  # reload tiap 30 detik
-        load_env_vars()
+# .env hanya di-parse ulang kalau file berubah. Baca nilai lewat
+# config.snapshot (immutable, tanpa lock).
+# ===============================
+config = ConfigService(
+    ["API_TOKEN", "YOLO_MODEL", "YOLO_BACKEND", "YOLO_CALIB_DIR", "YOLO_ADAPTIVE", "OBAT_CSV",
+     "WEBHOOK_NORMAL", "WEBHOOK_REMINDER", "OCR_WORKERS", "INFO_CACHE_TTL_HOURS", "INFO_CACHE_MB",
+     "AUDIO_BANK"],
+    secrets=["API_TOKEN", "WEBHOOK_NORMAL", "WEBHOOK_REMINDER"],
+)
 
-threading.Thread(target=env_refresher, daemon=True).start()
+# ===============================
+# OCR PROCESS POOL
+# EasyOCR jalan di proses terpisah (tidak rebutan GIL dengan YOLO/Flask/
+# voice). Dibuat sebelum model di-load supaya fork masih ringan.
+# OCR_WORKERS=0 → OCR di thread proses utama seperti sebelumnya.
+# ===============================
+OCR_WORKERS = int(config.snapshot.OCR_WORKERS or 2)
+ocr_pool = None
+if OCR_WORKERS > 0:
+    ocr_pool = OcrPool(workers=OCR_WORKERS)
+    ocr_pool.start()
 
 # ===============================
 # YOLO MODEL
 # ===============================
-model = YOLO(YOLO_MODEL)
 device = "cuda" if torch.cuda.is_available() else "cpu"
 print(f"✅ Running on: {device}")
 
+# YOLO_BACKEND: torch / onnx / openvino / ncnn, atau auto (default) untuk
+# export sekali + pilih backend tercepat lewat micro-benchmark saat start.
+# openvino-int8 (opt-in) butuh YOLO_CALIB_DIR berisi frame contoh.
+def load_yolo(path):
+    snapshot = config.snapshot
+    return load_detector(path, backend=snapshot.YOLO_BACKEND, imgsz=640, device=device,
+                         calib_dir=snapshot.YOLO_CALIB_DIR)
+
+# YOLO_MODEL berubah → weights baru di-load + warmup di background,
+# detect stage tetap pakai model lama sampai swap
+models = ModelManager(load_yolo, device=device)
+models.load(config.snapshot.YOLO_MODEL)
+config.subscribe("YOLO_MODEL", lambda old, new: models.swap(new))
+config.subscribe("YOLO_BACKEND", lambda old, new: models.swap(config.snapshot.YOLO_MODEL))
+
 # ===============================
 # EasyOCR
 # ===============================
-reader = easyocr.Reader(['en'], gpu=(device == "cuda"))
+reader = easyocr.Reader(['en'], gpu=(device == "cuda")) if ocr_pool is None else None
 
 # ===============================
 # Daftar Obat
 # ===============================
+# CSV di-compile ke .vmcat (otomatis compile ulang kalau CSV berubah),
+# lalu di-mmap tanpa pandas. Kalau CSV / OBAT_CSV berubah, matcher
+# dibangun ulang di background dan di-swap tanpa restart.
+catalog_holder = CatalogHolder(lambda: config.snapshot.OBAT_CSV)
 try:
-    df = pd.read_csv(OBAT_CSV)
-    daftar_obat = df["nama_obat"].dropna().astype(str).tolist()
-    print(f"📦 Loaded {len(daftar_obat)} obat dari {OBAT_CSV}")
+    catalog_holder.reload(force=True)
 except Exception as e:
     print(f"⚠️ Gagal load CSV: {e}")
-    daftar_obat = []
+catalog_holder.start()
+config.subscribe("OBAT_CSV", lambda old, new: catalog_holder.reload())
+config.start()
 
 # ===============================
 # Kamera
 # ===============================
-picam2 = Picamera2()
-picam2.configure(
-    picam2.create_preview_configuration(main={"format": "RGB888", "size": (640, 480)})
-)
-picam2.start()
+# dual-stream: lores 640x480 untuk deteksi + stream, main 1640x1232 hanya
+# untuk crop OCR (box dipetakan ke resolusi tinggi, lihat camera.py)
+# (di-start bersama pipeline)
+camera = PicameraSource(main_size=(1640, 1232), lores_size=(640, 480))
 
 # ===============================
 # Voice Assistant Config
@@ -148,26 +167,25 @@ warning_cooldown = 3  # detik
 # ===============================
 # UTILS
 # ===============================
+TTS_MS = REGISTRY.histogram("vismed_tts_ms", "Sintesis TTS teks → wav (ms)")
+
 def append2log(text):
     global today
     fname = f"chatlog-{today}.txt"
     with open(fname, "a", encoding="utf-8") as f:
         f.write(text + "\n")
 
-def tts_to_wav(text, filename):
-    tts = gTTS(text, lang="id", tld="co.id")
-    tts.save("temp.mp3")
-    sound = AudioSegment.from_mp3("temp.mp3")
-    sound = sound.set_frame_rate(48000)
-    sound.export(filename, format="wav")
-    os.remove("temp.mp3")
+def tts_to_wav_bytes(text):
+    # gTTS → MP3 di memori → satu pipe ffmpeg → WAV 48 kHz, tanpa file
+    # sementara di SD card (lihat tts.py)
+    with TTS_MS.time():
+        return tts_wav(text)
 
-def play_wav(filename):
-    mixer.music.load(filename)
+def play_audio_bytes(data, fmt="wav"):
+    mixer.music.load(BytesIO(data), fmt)
     mixer.music.play()
     while mixer.music.get_busy():
         time.sleep(0.1)
-    os.remove(filename)
 
 def play_music_from_url(url):
     try:
@@ -185,26 +203,32 @@ def extract_music_url(text):
         return match.group(1)
     return None
 
+# koneksi keep-alive + retry + circuit breaker (lihat webhook.py):
+# tunnel mati tidak lagi menahan pemanggil 20 detik tiap kali
+webhook = WebhookClient()
+
 def send_to_webhook(url, role, text):
-    try:
-        payload = {"role": role, "text": text, "timestamp": str(time.time())}
-        resp = requests.post(url, json=payload, timeout=20)
-        print(f"[Webhook] Sent: {payload}")
-        print(f"[Webhook] Response: {resp.status_code} {resp.text}")
-        if resp.status_code == 200:
-            data = resp.json()
-            if isinstance(data, list) and len(data) > 0:
-                return data[0].get("output", "")
-            elif isinstance(data, dict):
-                return data.get("output") or data.get("message", "")
-    except Exception as e:
-        print(f"[Webhook Error] {e}")
-    return ""
+    return webhook.post(url, role, text)
+
+# jawaban "Berikan Informasi Obat" + audionya disimpan per obat,
+# deteksi ulang obat yang sama langsung diputar (lihat response_cache.py)
+info_cache = ResponseCache(
+    "cache/obat_info.sqlite",
+    ttl=float(config.snapshot.INFO_CACHE_TTL_HOURS or 168) * 3600,
+    max_mb=float(config.snapshot.INFO_CACHE_MB or 64),
+)
+
+# clip ringkasan per obat yang di-synthesize sebelumnya (python audio_bank.py ...)
+audio_bank = AudioBank(config.snapshot.AUDIO_BANK or "sounds/obat.vmbank")
+print(f"🔊 Audio bank: {len(audio_bank)} clip obat")
+
+# jawaban panjang diputar per kalimat: kalimat berikutnya di-synthesize
+# selagi kalimat sekarang diputar (lihat speech_stream.py)
+speech = SpeechStream(tts_to_wav_bytes, play_audio_bytes)
 
 def text2speech_play(text):
-    audio_file = f"temp_audio_{int(time.time())}.wav"
-    tts_to_wav(text, audio_file)
-    play_wav(audio_file)
+    _, stats = speech.speak(text)
+    print(f"[TTS] {stats}")
 
 # ===============================
 # Play Warning dari folder sounds/
@@ -244,123 +268,108 @@ app = Flask(__name__)
 def require_token(func):
     def wrapper(*args, **kwargs):
         token = request.args.get("token")
-        if token != API_TOKEN:
+        if token != config.snapshot.API_TOKEN:
             abort(403)
         return func(*args, **kwargs)
     wrapper.__name__ = func.__name__
     return wrapper
 
 # ===============================
-# BACKGROUND CAMERA LOOP
-# ===============================
-frame_count = 0
-last_frame = None
-
-def camera_loop():
-    global frame_count, session_active, last_warning_time, last_frame, ultrasonic_active
-    while True:
-        try:
-            frame = picam2.capture_array()
-        except Exception as e:
-            print(f"⚠️ Kamera error: {e}")
-            continue
-
-        results = model(frame, imgsz=640, device=device, verbose=False)
-        detected_obats = []  # kumpulin semua hasil OCR
-        boxes_exist = False
-
-        for result in results:
-            boxes = result.boxes.xyxy.cpu().numpy()
-            confs = result.boxes.conf.cpu().numpy()
-            clss = result.boxes.cls.cpu().numpy()
-
-            if len(boxes) > 0:
-                boxes_exist = True
-
-            for box, conf, cls in zip(boxes, confs, clss):
-                x1, y1, x2, y2 = map(int, box)
-                label = model.names[int(cls)]
-
-                detected_text = "Tidak terbaca"
-                best_match, score = None, 0
-
-                if frame_count % 10 == 0 and (y2 > y1 and x2 > x1):
-                    roi = frame[y1:y2, x1:x2]
-                    try:
-                        ocr_result = reader.readtext(roi)
-                        if ocr_result:
-                            detected_text = max(ocr_result, key=lambda x: x[2])[1]
-
-                            for obat in daftar_obat:
-                                sim = textdistance.levenshtein.normalized_similarity(
-                                    detected_text.lower(), obat.lower()
-                                )
-                                sim_score = int(sim * 100)
-                                if sim_score > score:
-                                    best_match, score = obat, sim_score
-
-                            if best_match:
-                                detected_obats.append((best_match, score))
-                                print(f"[OCR] {detected_text} => {best_match}, {score}%")
-
-                    except Exception as e:
-                        print(f"OCR error: {e}")
-
-                display_text = f"{label} ({conf:.2f}) - {detected_text}"
-                if best_match:
-                    display_text += f" -> {best_match} ({score}%)"
-                if session_active:
-                    display_text += " [mode voice aktif]"
-
-                box_color = (0, 0, 255) if session_active else (0, 255, 0)
-                cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
-                cv2.putText(frame, display_text,
-                            (x1, max(0, y1 - 10)),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.6, box_color, 2)
-
-        # ✅ ultrasonic check (hanya aktif jika ultrasonic_active True)
-        if ultrasonic_active and boxes_exist:
-            distance = get_distance()
-            print(f"📏 Jarak: {distance:.2f} cm")
-
-            now = time.time()
-            if distance > 20 and (now - last_warning_time > warning_cooldown):
-                safe_play_warning("Jarak Terlalu Jauh.mp3")
-                last_warning_time = now
-            elif distance < 15 and (now - last_warning_time > warning_cooldown):
-                safe_play_warning("Jarak Terlalu Dekat.mp3")
-                last_warning_time = now
-
-        # 🔄 ambil obat dengan rata-rata score tertinggi
-        if not session_active and len(detected_obats) >= 1:
-            from collections import defaultdict
-            score_map = defaultdict(list)
-            for obat, score in detected_obats:
-                score_map[obat].append(score)
-
-            avg_scores = {obat: sum(scores)/len(scores) for obat, scores in score_map.items()}
-            best_obat, best_score = max(avg_scores.items(), key=lambda x: x[1])
-
-            print(f"💊 Obat kandidat: {best_obat} (avg {best_score:.2f}%) dari {len(detected_obats)} deteksi")
-
-            if best_score >= 60:
-                detection_sound = "Obat Terdeteksi. Mohon Tunggu Beberapa Saat.mp3"
-                if os.path.exists(os.path.join("sounds", detection_sound)):
-                    safe_play_warning(detection_sound)
-                else:
-                    print(f"[Missing Sound] sounds/{detection_sound} tidak ditemukan.")
+# CAMERA PIPELINE
+# capture → detect → OCR → match → annotate/encode (lihat vision.py),
+# ditambah stage ultrasonic + announce milik aplikasi ini.
+# Tiap stage jalan di thread sendiri, jadi OCR/webhook yang lambat
+# tidak menahan stream MJPEG.
+# ===============================
+broadcaster = FrameBroadcaster()
+
+vision = VisionPipeline(camera, models, catalog_holder, reader=reader, ocr_pool=ocr_pool,
+                        broadcaster=broadcaster, device=device)
+vision.adaptive_enabled = lambda: config.snapshot.YOLO_ADAPTIVE == "1"
+pipeline = vision.pipeline
+
+def on_detections():
+    # ✅ ultrasonic check (hanya aktif jika ultrasonic_active True)
+    if ultrasonic_active:
+        pipeline["ultrasonic"].submit(time.time())
+
+def announce_track(track):
+    # obat yang sudah yakin dibacakan sekali per track;
+    # jangan antri info obat baru selama yang lama masih dibacakan
+    if session_active or not pipeline["announce"].idle():
+        return False
+    print(f"💊 Obat track #{track.id}: {track.medicine} (avg {track.score:.2f}%)")
+    pipeline["announce"].submit(track.medicine)
+    return True
+
+def voice_status():
+    return (" [mode voice aktif]", (0, 0, 255)) if session_active else None
+
+vision.on_detections = on_detections
+vision.on_confident = announce_track
+vision.status = voice_status
+
+# metrik yang dibaca saat /metrics di-scrape (tanpa kerja di hot loop)
+REGISTRY.callback("vismed_stream_clients", "Client /video_feed yang terhubung",
+                  lambda: broadcaster.stats()["client_count"])
+REGISTRY.callback("vismed_cpu_temperature_celsius", "Suhu CPU", cpu_temperature)
+REGISTRY.callback("vismed_throttled", "Status get_throttled firmware (0 = normal)", throttled)
+
+def announce_obat(best_obat):
+    banked = audio_bank.get(best_obat)
+    if banked and banked[0].source == "webhook":
+        # bank berisi jawaban lengkap: langsung putar, tanpa jaringan
+        print(f"💊 Info {best_obat} dari audio bank")
+        play_audio_bytes(banked[1], banked[0].fmt)
+        return
 
-                time.sleep(3)
-                info_text = f"Berikan Informasi Obat {best_obat}"
-                response_text = send_to_webhook(WEBHOOK_NORMAL, "System", info_text)
-                if response_text:
-                    text2speech_play(response_text)
+    cached = info_cache.get(best_obat)
+    if cached:
+        response_text, audio = cached
+        print(f"💊 Info {best_obat} dari cache")
+        if audio:
+            play_audio_bytes(audio)
+        else:
+            text2speech_play(response_text)
+        return
 
-        frame_count += 1
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if ret:
-            last_frame = buffer.tobytes()
+    # request dikirim duluan, jalan bersamaan dengan suara "mohon tunggu"
+    info_text = f"Berikan Informasi Obat {best_obat}"
+    pending = webhook.submit(config.snapshot.WEBHOOK_NORMAL, "System", info_text)
+
+    if banked:
+        # clip template ("Obat terdeteksi, <nama>...") menggantikan suara tunggu umum
+        play_audio_bytes(banked[1], banked[0].fmt)
+    else:
+        detection_sound = "Obat Terdeteksi. Mohon Tunggu Beberapa Saat.mp3"
+        if os.path.exists(os.path.join("sounds", detection_sound)):
+            safe_play_warning(detection_sound)
+        else:
+            print(f"[Missing Sound] sounds/{detection_sound} tidak ditemukan.")
+        time.sleep(3)
+
+    response_text = pending.result()
+    if response_text:
+        # diputar per kalimat, audio digabung untuk cache
+        audios, stats = speech.speak(response_text, keep=True)
+        if stats["played"] == stats["sentences"]:
+            info_cache.put(best_obat, response_text, join_wav(audios))
+
+def check_ultrasonic(_):
+    global last_warning_time
+    distance = get_distance()
+    print(f"📏 Jarak: {distance:.2f} cm")
+
+    now = time.time()
+    if distance > 20 and (now - last_warning_time > warning_cooldown):
+        safe_play_warning("Jarak Terlalu Jauh.mp3")
+        last_warning_time = now
+    elif distance < 15 and (now - last_warning_time > warning_cooldown):
+        safe_play_warning("Jarak Terlalu Dekat.mp3")
+        last_warning_time = now
+
+pipeline.add(Stage("ultrasonic", check_ultrasonic, maxsize=1))
+pipeline.add(Stage("announce", announce_obat, maxsize=1))
 
 # ===============================
 # Flask Routes
@@ -368,15 +377,67 @@ def camera_loop():
 @app.route('/video_feed')
 @require_token
 def video_feed():
+    # ?fps=10 untuk membatasi kecepatan kirim ke client ini
+    max_fps = request.args.get("fps", type=float)
+    frames = broadcaster.subscribe(request.remote_addr, max_fps=max_fps)
+
     def gen_frames():
-        global last_frame
-        while True:
-            if last_frame:
+        try:
+            for frame in frames:
                 yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + last_frame + b'\r\n')
-            time.sleep(0.05)
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+        finally:
+            frames.close()
     return Response(gen_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/video_feed/stats')
+@require_token
+def video_feed_stats():
+    """Jumlah client stream + jumlah frame terkirim/drop per client"""
+    return jsonify(broadcaster.stats())
+
+@app.route('/catalog_stats')
+@require_token
+def catalog_stats():
+    """Jumlah obat aktif + info reload katalog terakhir"""
+    return jsonify(catalog_holder.stats())
+
+@app.route('/model_stats')
+@require_token
+def model_stats():
+    """Model YOLO aktif + waktu load/warmup terakhir"""
+    return jsonify({**models.stats(), "adaptive": vision.adaptive.stats()})
+
+@app.route('/webhook_stats')
+@require_token
+def webhook_stats():
+    """Status circuit breaker per host webhook"""
+    return jsonify(webhook.stats())
+
+@app.route('/info_cache_stats')
+@require_token
+def info_cache_stats():
+    """Isi + hit/miss cache info obat"""
+    return jsonify(info_cache.stats())
+
+@app.route('/audio_bank_stats')
+@require_token
+def audio_bank_stats():
+    """Jumlah clip + hit/miss audio bank"""
+    return jsonify(audio_bank.stats())
+
+@app.route('/pipeline_stats')
+@require_token
+def pipeline_stats():
+    """Queue depth + latency tiap stage camera pipeline"""
+    return jsonify(vision.stats())
+
+@app.route('/metrics')
+@require_token
+def metrics():
+    """Metrik format Prometheus (scrape_config: params: token: [...])"""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
 @app.route('/')
 def home():
     return "📹 Raspberry Pi Camera Server jalan! Akses stream di /video_feed?token=vismed-raspberry123"
@@ -403,7 +464,7 @@ def main():
     rec.dynamic_energy_threshold = False
     rec.energy_threshold = 400
 
-    current_webhook = WEBHOOK_NORMAL
+    current_webhook = config.snapshot.WEBHOOK_NORMAL
     reminder_mode = False
 
     while True:
@@ -424,7 +485,7 @@ def main():
                         print("[Wake Word Detected] Normal session started!")
                         session_active = True
                         ultrasonic_active = False
-                        current_webhook = WEBHOOK_NORMAL
+                        current_webhook = config.snapshot.WEBHOOK_NORMAL
                         text2speech_play("Halo, vismed di sini. Ada yang bisa dibantu?")
                         continue
                     elif text.startswith(REMINDER_WAKE_WORD):
@@ -441,18 +502,18 @@ def main():
                     text2speech_play("Sama sama kak")
                     session_active = False
                     ultrasonic_active = True
-                    current_webhook = WEBHOOK_NORMAL
+                    current_webhook = config.snapshot.WEBHOOK_NORMAL
                     continue
 
                 if reminder_mode:
-                    response_text = send_to_webhook(WEBHOOK_REMINDER, "User", text)
+                    response_text = send_to_webhook(config.snapshot.WEBHOOK_REMINDER, "User", text)
                     if response_text:
                         text2speech_play(response_text)
                     print("[Reminder session ended]")
                     session_active = False
                     reminder_mode = False
                     ultrasonic_active = True
-                    current_webhook = WEBHOOK_NORMAL
+                    current_webhook = config.snapshot.WEBHOOK_NORMAL
                     continue
                 else:
                     response_text = send_to_webhook(current_webhook, "User", text)
@@ -477,8 +538,14 @@ def run_flask():
 if __name__ == "__main__":
     try:
         safe_play_warning("Raspberry Ready.mp3")
-        threading.Thread(target=camera_loop, daemon=True).start()
+        vision.start()
         threading.Thread(target=run_flask, daemon=True).start()
         main()
     finally:
+        if ocr_pool is not None:
+            ocr_pool.stop()
+        vision.stop()
+        webhook.close()
+        info_cache.close()
+        audio_bank.close()
         GPIO.cleanup()
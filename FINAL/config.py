@@ -0,0 +1,95 @@
+"""
+Config service untuk .env.
+
+Snapshot config berupa namedtuple immutable. Pembaca cukup ambil
+`config.snapshot` (satu baca referensi, tanpa lock). File .env hanya
+di-parse ulang kalau mtime/size-nya berubah, dan subscriber dipanggil
+hanya untuk key yang nilainya benar-benar berubah.
+"""
+import collections
+import os
+import threading
+import time
+
+from dotenv import dotenv_values, find_dotenv
+
+
+def mask(value):
+    """Sembunyikan secret di log"""
+    if not value:
+        return str(value)
+    return value[:4] + "***" if len(value) > 8 else "***"
+
+
+class ConfigService:
+    def __init__(self, keys, path=None, interval=1.0, secrets=()):
+        self.keys = list(keys)
+        self.secrets = set(secrets)     # key yang nilainya di-mask di log
+        # sama dengan load_dotenv(): cari .env naik dari folder script, bukan CWD
+        # (systemd / cron / python FINAL/checkpoint15-final.py)
+        self.path = path or find_dotenv() or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+        self.interval = interval
+        self._type = collections.namedtuple("Config", self.keys)
+        self._subscribers = collections.defaultdict(list)
+        self._signature = None
+        self.snapshot = self._read()
+        self._signature = self._file_signature()
+        print("🔄 ENV Loaded: " + self._describe(self.keys))
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self):
+        # nilai di .env menang atas environment (sama seperti load_dotenv(override=True))
+        values = dotenv_values(self.path) if os.path.exists(self.path) else {}
+        return self._type(**{k: values.get(k) or os.getenv(k) for k in self.keys})
+
+    def _describe(self, keys):
+        return ", ".join(
+            f"{k}={mask(getattr(self.snapshot, k)) if k in self.secrets else getattr(self.snapshot, k)}"
+            for k in keys
+        )
+
+    def get(self, key):
+        return getattr(self.snapshot, key)
+
+    def subscribe(self, key, callback):
+        """callback(old, new) dipanggil di thread watcher saat `key` berubah"""
+        self._subscribers[key].append(callback)
+
+    def reload(self):
+        """Parse ulang .env kalau file berubah. Return daftar key yang berubah"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return []
+        self._signature = signature
+
+        old, new = self.snapshot, self._read()
+        changed = [k for k in self.keys if getattr(old, k) != getattr(new, k)]
+        if not changed:
+            return []
+
+        self.snapshot = new
+        print("🔄 ENV berubah: " + self._describe(changed))
+        for key in changed:
+            for callback in self._subscribers[key]:
+                try:
+                    callback(getattr(old, key), getattr(new, key))
+                except Exception as e:
+                    print(f"⚠️ Config subscriber {key} error: {e}")
+        return changed
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"⚠️ Gagal reload .env: {e}")
+
+    def start(self):
+        threading.Thread(target=self._watch, name="config-watch", daemon=True).start()
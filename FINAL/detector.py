@@ -0,0 +1,143 @@
+"""
+Backend detector YOLO: PyTorch (.pt), ONNX, OpenVINO dan NCNN.
+
+Weights .pt di-export sekali lewat Ultralytics dan hasilnya di-cache di
+sebelah file weights (best_tuned.onnx, best_tuned_openvino_model/,
+best_tuned_ncnn_model/). Semua backend di-load lewat YOLO(...), jadi output
+tetap Results dengan result.boxes yang sama seperti model .pt.
+
+Mode "auto" menjalankan micro-benchmark saat start dan memilih backend
+tercepat di device ini.
+
+Backend "openvino-int8" (opt-in, tidak ikut mode auto) meng-quantize model
+ke INT8 dengan folder frame contoh sebagai data kalibrasi. Cek dulu
+penurunan akurasinya dengan eval_quant.py sebelum dipakai.
+"""
+import os
+import statistics
+import time
+
+import numpy as np
+import yaml
+from ultralytics import YOLO
+
+# backend → (format export Ultralytics, suffix artefak, int8)
+BACKENDS = {
+    "torch": (None, ".pt", False),
+    "onnx": ("onnx", ".onnx", False),
+    "openvino": ("openvino", "_openvino_model", False),
+    "ncnn": ("ncnn", "_ncnn_model", False),
+    "openvino-int8": ("openvino", "_int8_openvino_model", True),
+}
+AUTO_BACKENDS = ["torch", "onnx", "openvino", "ncnn"]
+
+
+class Detector:
+    """Bungkus model YOLO + nama backend. Dipanggil persis seperti YOLO"""
+
+    def __init__(self, model, backend, path):
+        self.model = model
+        self.backend = backend
+        self.path = path
+        self.timings = {}   # hasil micro-benchmark (mode auto)
+
+    def __call__(self, frame, **kwargs):
+        return self.model(frame, **kwargs)
+
+    @property
+    def names(self):
+        return self.model.names
+
+
+def exported_path(weights, backend):
+    fmt, suffix, _ = BACKENDS[backend]
+    if fmt is None:
+        return weights
+    return os.path.splitext(weights)[0] + suffix
+
+
+def dataset_yaml(folder, names):
+    """
+    Tulis data.yaml Ultralytics untuk satu folder gambar.
+
+    Folder kalibrasi cukup berisi gambar. Folder berlabel pakai format YOLO
+    (images/ + labels/), yaml menunjuk ke images/.
+    """
+    folder = os.path.abspath(folder)
+    images = os.path.join(folder, "images") if os.path.isdir(os.path.join(folder, "images")) else folder
+    path = os.path.join(folder, "vismed_data.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump({"path": folder, "train": images, "val": images, "names": dict(names)}, f)
+    return path
+
+
+def export(weights, backend, imgsz=640, calib_dir=None):
+    """Export weights ke backend, pakai cache kalau artefak lebih baru dari weights"""
+    fmt, _, int8 = BACKENDS[backend]
+    target = exported_path(weights, backend)
+    if fmt is None:
+        return target
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(weights):
+        return target
+
+    model = YOLO(weights)
+    kwargs = {}
+    if int8:
+        if not calib_dir or not os.path.isdir(calib_dir):
+            raise ValueError(f"Backend {backend} butuh folder kalibrasi (YOLO_CALIB_DIR), dapat: {calib_dir}")
+        kwargs = {"int8": True, "data": dataset_yaml(calib_dir, model.names)}
+
+    print(f"📦 Export {weights} → {backend} ...")
+    t0 = time.perf_counter()
+    produced = model.export(format=fmt, imgsz=imgsz, verbose=False, **kwargs)
+    print(f"✅ Export {backend} selesai ({time.perf_counter() - t0:.1f} s): {produced}")
+    return str(produced)
+
+
+def load_backend(weights, backend, imgsz=640, calib_dir=None):
+    path = export(weights, backend, imgsz, calib_dir)
+    return Detector(YOLO(path, task="detect"), backend, path)
+
+
+def benchmark(detector, imgsz=640, device="cpu", runs=10, shape=(480, 640, 3)):
+    """Median latency (ms) inference di frame dummy"""
+    frame = np.random.randint(0, 255, shape, dtype=np.uint8)
+    for _ in range(2):
+        detector(frame, imgsz=imgsz, device=device, verbose=False)
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        detector(frame, imgsz=imgsz, device=device, verbose=False)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def load_fastest(weights, candidates=None, imgsz=640, device="cpu", runs=10):
+    """Export + benchmark tiap backend, return (detector tercepat, {backend: ms})"""
+    results = {}
+    best, best_ms = None, float("inf")
+    for backend in candidates or AUTO_BACKENDS:
+        try:
+            detector = load_backend(weights, backend, imgsz)
+            ms = benchmark(detector, imgsz=imgsz, device=device, runs=runs)
+        except Exception as e:
+            print(f"⚠️ Backend {backend} gagal: {e}")
+            continue
+        results[backend] = round(ms, 1)
+        print(f"⏱️ {backend:<9} {ms:7.1f} ms/frame")
+        if ms < best_ms:
+            best, best_ms = detector, ms
+
+    if best is None:
+        raise RuntimeError(f"Tidak ada backend yang bisa jalan untuk {weights}")
+    print(f"🏁 Backend terpilih: {best.backend} ({best_ms:.1f} ms/frame)")
+    best.timings = results
+    return best, results
+
+
+def load_detector(weights, backend="auto", imgsz=640, device="cpu", calib_dir=None):
+    """Entry point untuk ModelManager: backend tertentu atau 'auto'"""
+    if backend in (None, "", "auto"):
+        detector, _ = load_fastest(weights, imgsz=imgsz, device=device)
+        return detector
+    return load_backend(weights, backend, imgsz, calib_dir)
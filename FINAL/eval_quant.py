@@ -0,0 +1,71 @@
+"""
+Bandingkan akurasi + kecepatan model INT8 vs FP32 di folder berlabel.
+
+Folder berlabel pakai format YOLO: images/*.jpg + labels/*.txt.
+Folder kalibrasi cukup berisi frame contoh dari kamera (tanpa label).
+
+Contoh:
+    python eval_quant.py --model best_tuned.pt --calib calib_frames --labeled val_obat
+    python eval_quant.py --model best_tuned.pt --calib calib_frames --labeled val_obat --json hasil.json
+
+Exit code 1 kalau penurunan mAP50 / recall melebihi batas → speedup ditolak.
+"""
+import argparse
+import json
+import sys
+
+from ultralytics import YOLO
+
+from detector import dataset_yaml, export
+
+
+def evaluate(path, data, imgsz):
+    model = YOLO(path, task="detect")
+    metrics = model.val(data=data, imgsz=imgsz, batch=1, device="cpu", plots=False, verbose=False)
+    return {
+        "map50": float(metrics.box.map50),
+        "map50_95": float(metrics.box.map),
+        "precision": float(metrics.box.mp),
+        "recall": float(metrics.box.mr),
+        "inference_ms": float(metrics.speed["inference"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", required=True, help="Weights FP32 (.pt)")
+    parser.add_argument("--calib", required=True, help="Folder frame contoh untuk kalibrasi INT8")
+    parser.add_argument("--labeled", required=True, help="Folder berlabel (images/ + labels/)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--max-map-drop", type=float, default=0.01, help="Batas turun mAP50 (absolut)")
+    parser.add_argument("--max-recall-drop", type=float, default=0.02, help="Batas turun recall (absolut)")
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    int8_path = export(args.model, "openvino-int8", args.imgsz, calib_dir=args.calib)
+    data = dataset_yaml(args.labeled, YOLO(args.model).names)
+
+    fp32 = evaluate(args.model, data, args.imgsz)
+    int8 = evaluate(int8_path, data, args.imgsz)
+    delta = {k: int8[k] - fp32[k] for k in fp32}
+    speedup = fp32["inference_ms"] / int8["inference_ms"] if int8["inference_ms"] else 0.0
+
+    print(f"{'metric':<14}{'FP32':>10}{'INT8':>10}{'delta':>10}")
+    for k in fp32:
+        print(f"{k:<14}{fp32[k]:>10.4f}{int8[k]:>10.4f}{delta[k]:>+10.4f}")
+    print(f"Speedup inference: {speedup:.2f}x")
+
+    accepted = -delta["map50"] <= args.max_map_drop and -delta["recall"] <= args.max_recall_drop
+    print("✅ TERIMA: INT8 aman dipakai (YOLO_BACKEND=openvino-int8)" if accepted
+          else "❌ TOLAK: akurasi INT8 turun melebihi batas")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"fp32": fp32, "int8": int8, "delta": delta, "speedup": speedup,
+                       "accepted": accepted, "int8_model": int8_path}, f, indent=2)
+
+    sys.exit(0 if accepted else 1)
+
+
+if __name__ == "__main__":
+    main()
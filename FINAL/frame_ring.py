@@ -0,0 +1,101 @@
+"""
+Ring frame di shared memory untuk camera pipeline.
+
+Semua slot frame dialokasikan sekali di satu blok multiprocessing.shared_memory.
+Capture menulis langsung ke slot kosong, stage lain (detect, annotate,
+proses lain lewat attach()) membaca lewat index slot. Tiap slot punya
+reference count:
+  - acquire()  : capture ambil slot kosong (ref = 1)
+  - retain()   : sebelum packet diteruskan ke stage lain
+  - release()  : stage selesai / packet di-drop dari queue
+Slot baru boleh ditulis ulang setelah ref kembali 0, jadi frame yang masih
+dibaca tidak pernah tertimpa dan tidak ada alokasi array baru per frame.
+"""
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class FrameRing:
+    def __init__(self, slots=8, shape=(480, 640, 3), dtype=np.uint8, name=None, create=True):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.owner = create
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=slots * frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        self.refs = [0] * slots
+        self.frame_ids = [None] * slots
+        self.lock = threading.Lock()
+        self._next = 0
+        self.acquired = 0
+        self.full = 0
+
+    @classmethod
+    def attach(cls, name, slots=8, shape=(480, 640, 3), dtype=np.uint8):
+        """Buka ring milik proses lain (read-only by convention, ref count tetap di pemilik)"""
+        return cls(slots, shape, dtype, name=name, create=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def acquire(self, frame_id=None):
+        """Slot kosong tertua untuk ditulis, None kalau semua slot masih dipakai"""
+        with self.lock:
+            for i in range(self.slots):
+                slot = (self._next + i) % self.slots
+                if self.refs[slot] == 0:
+                    self.refs[slot] = 1
+                    self.frame_ids[slot] = frame_id
+                    self._next = (slot + 1) % self.slots
+                    self.acquired += 1
+                    return slot
+            self.full += 1
+            return None
+
+    def retain(self, slot, count=1):
+        with self.lock:
+            self.refs[slot] += count
+
+    def release(self, slot):
+        with self.lock:
+            if self.refs[slot] <= 0:
+                raise ValueError(f"slot {slot} di-release lebih dari sekali")
+            self.refs[slot] -= 1
+
+    def release_packet(self, packet):
+        """on_drop untuk Stage: packet yang dibuang dari queue melepas slotnya"""
+        self.release(packet["slot"])
+
+    def holding(self, func):
+        """Bungkus fungsi stage: ref slot packet dilepas setelah func selesai (juga kalau error)"""
+        def run(packet):
+            try:
+                func(packet)
+            finally:
+                self.release(packet["slot"])
+        run.__name__ = func.__name__
+        return run
+
+    def close(self):
+        del self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "name": self.name,
+                "slots": self.slots,
+                "in_use": sum(1 for r in self.refs if r),
+                "refs": list(self.refs),
+                "acquired": self.acquired,
+                "full": self.full,
+            }
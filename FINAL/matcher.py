@@ -0,0 +1,99 @@
+"""
+Pencocokan teks OCR ke daftar nama obat.
+
+Katalog di-normalisasi sekali saat load, lalu semua teks OCR dalam satu
+frame di-score sekaligus lewat rapidfuzz process.cdist (C++, multi-thread).
+Score sama dengan int(textdistance.levenshtein.normalized_similarity * 100):
+dihitung di float64 lalu dipotong dengan int(), persis seperti loop lama.
+
+Untuk katalog besar (>= INDEX_MIN_SIZE nama) kandidat di-shortlist dulu
+lewat TrigramIndex, baru di-rerank dengan Levenshtein.
+"""
+import numpy as np
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
+
+from ngram_index import TrigramIndex
+
+INDEX_MIN_SIZE = 2000
+SHORTLIST_SIZE = 200
+
+
+def normalize(text):
+    """Lowercase saja, supaya score identik dengan loop lama (threshold 60 tetap berlaku)"""
+    return str(text).lower()
+
+
+def top_k_rows(matrix, k):
+    """Index top-k per baris matrix score, urut dari score tertinggi"""
+    if k == 1:
+        return np.argmax(matrix, axis=1)[:, None]
+    top = np.argpartition(-matrix, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(matrix, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+class MedicineMatcher:
+    def __init__(self, names, keys=None, index=None,
+                 index_min_size=INDEX_MIN_SIZE, shortlist_size=SHORTLIST_SIZE):
+        self.names = list(names)
+        self.keys = list(keys) if keys is not None else [normalize(n) for n in self.names]
+        self.shortlist_size = shortlist_size
+        # katalog kecil lebih cepat di-scan penuh
+        if len(self.keys) < index_min_size:
+            index = None
+        elif index is None:
+            index = TrigramIndex.build(self.keys)
+        self.index = index
+
+    @classmethod
+    def from_catalog(cls, catalog, **kwargs):
+        """Pakai nama, key dan index yang sudah ada di Catalog (.vmcat)"""
+        return cls(catalog.names, keys=catalog.keys, index=catalog.index, **kwargs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def scores(self, texts, keys=None):
+        """Matrix score (len(texts) x len(keys)), skala 0-100"""
+        return process.cdist(
+            [normalize(t) for t in texts], self.keys if keys is None else keys,
+            scorer=Levenshtein.normalized_similarity,
+            dtype=np.float64, workers=-1,
+        ) * 100
+
+    def match_many(self, texts, top_k=1):
+        """Top-k (nama_obat, score) untuk tiap teks OCR, urut score tertinggi"""
+        if not texts:
+            return []
+        if not self.names:
+            return [[] for _ in texts]
+        if self.index is not None:
+            return [self._match_indexed(t, top_k) for t in texts]
+
+        matrix = self.scores(texts)
+        rows = top_k_rows(matrix, min(top_k, len(self.names)))
+        return [[(self.names[i], int(row[i])) for i in idx] for row, idx in zip(matrix, rows)]
+
+    def _match_indexed(self, text, top_k):
+        candidates = self.index.shortlist(normalize(text), self.shortlist_size)
+        if len(candidates) == 0:
+            # tidak ada trigram yang sama sama sekali, pakai scan penuh
+            matrix, candidates = self.scores([text]), np.arange(len(self.names))
+        else:
+            matrix = self.scores([text], [self.keys[i] for i in candidates])
+        idx = top_k_rows(matrix, min(top_k, matrix.shape[1]))[0]
+        return [(self.names[candidates[i]], int(matrix[0, i])) for i in idx]
+
+    def best(self, text):
+        """(nama_obat, score) terbaik untuk satu teks, (None, 0) kalau katalog kosong"""
+        matches = self.match_many([text])[0]
+        return matches[0] if matches else (None, 0)
+
+    def extract(self, text, top_k=5):
+        """Top-k untuk satu teks tanpa bikin matrix penuh"""
+        found = process.extract(
+            normalize(text), self.keys,
+            scorer=Levenshtein.normalized_similarity, limit=top_k,
+        )
+        return [(self.names[i], int(score * 100)) for _, score, i in found]
@@ -0,0 +1,233 @@
+"""
+Registry metrik format Prometheus (text exposition 0.0.4), tanpa dependency.
+
+Hot path tidak pakai lock: tiap thread menulis ke cell miliknya sendiri
+(satu penulis per cell), lock hanya dipakai sekali saat thread pertama kali
+menulis ke suatu metrik. Saat /metrics di-scrape semua cell dijumlahkan.
+Cell milik thread yang sudah selesai (producer TTS per speak(), thread
+request Flask) digabung ke satu cell dasar, jadi jumlah cell mengikuti
+thread yang masih hidup, bukan semua thread yang pernah menulis.
+Nilai yang sudah ada di state lain (queue depth, jumlah client stream, suhu
+CPU) dibaca lewat callback saat scrape, jadi tidak menambah kerja per frame.
+
+    frames = REGISTRY.counter("vismed_frames_total", "Frame diproses")
+    frames.inc()
+    yolo_ms = REGISTRY.histogram("vismed_yolo_ms", "Waktu inference YOLO (ms)")
+    with yolo_ms.time():
+        ...
+"""
+import bisect
+import threading
+import time
+
+# milidetik: dari encode JPEG (~2 ms) sampai webhook LLM (> 10 detik)
+DEFAULT_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+THERMAL_PATH = "/sys/class/thermal/thermal_zone0/temp"
+THROTTLED_PATH = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{str(v)}"' for k, v in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """Metrik dengan satu cell per thread penulis"""
+    kind = "untyped"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._local = threading.local()
+        self._cells = []        # (thread, cell) per thread penulis yang masih hidup
+        self._base = None       # jumlah cell dari thread yang sudah selesai
+        self._lock = threading.Lock()
+
+    def _new_cell(self):
+        raise NotImplementedError
+
+    def _cell(self):
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = self._new_cell()
+            with self._lock:
+                self._fold_dead()
+                self._cells.append((threading.current_thread(), cell))
+            self._local.cell = cell
+        return cell
+
+    def _fold_dead(self):
+        """Gabungkan cell thread yang sudah selesai ke cell dasar (dipanggil di dalam lock)"""
+        alive = []
+        for thread, cell in self._cells:
+            if thread.is_alive():
+                alive.append((thread, cell))
+                continue
+            # thread sudah mati: tidak ada penulis lagi, aman dijumlahkan
+            if self._base is None:
+                self._base = self._new_cell()
+            for i, value in enumerate(cell):
+                self._base[i] += value
+        self._cells = alive
+
+    def _snapshot(self):
+        with self._lock:
+            self._fold_dead()
+            cells = [list(c) for _, c in self._cells]
+            if self._base is not None:
+                cells.append(list(self._base))
+            return cells
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def _new_cell(self):
+        return [0]
+
+    def inc(self, amount=1):
+        self._cell()[0] += amount
+
+    def value(self):
+        return sum(c[0] for c in self._snapshot())
+
+    def samples(self):
+        yield self.name, {}, self.value()
+
+
+class _Timer:
+    __slots__ = ("histogram", "t0")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe((time.perf_counter() - self.t0) * 1000)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_cell(self):
+        # count per bucket (tidak kumulatif) + bucket +Inf, lalu count, sum
+        return [0] * (len(self.buckets) + 1) + [0, 0.0]
+
+    def observe(self, value):
+        cell = self._cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-2] += 1
+        cell[-1] += value
+
+    def time(self):
+        """with histogram.time(): ... → observe durasi dalam ms"""
+        return _Timer(self)
+
+    def samples(self):
+        cells = self._snapshot()
+        n = len(self.buckets) + 1
+        totals = [sum(c[i] for c in cells) for i in range(n)]
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), totals):
+            running += count
+            yield self.name + "_bucket", {"le": _format_value(float(bound))}, running
+        yield self.name + "_count", {}, sum(c[-2] for c in cells)
+        yield self.name + "_sum", {}, sum(c[-1] for c in cells)
+
+
+class Callback:
+    """Nilai dibaca saat scrape: fn() → angka, atau list (labels, angka)"""
+
+    def __init__(self, name, help_text, fn, kind="gauge"):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        value = self.fn()
+        if value is None:
+            return
+        if isinstance(value, (int, float)):
+            yield self.name, {}, value
+            return
+        for labels, v in value:
+            yield self.name, labels, v
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_add(self, name, factory):
+        # idempotent: modul yang dibuat ulang (benchmark, reload) pakai metrik yang sama
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = factory()
+            return metric
+
+    def counter(self, name, help_text):
+        return self._get_or_add(name, lambda: Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._get_or_add(name, lambda: Histogram(name, help_text, buckets))
+
+    def callback(self, name, help_text, fn, kind="gauge"):
+        """Daftarkan / ganti callback (yang terakhir menang)"""
+        with self._lock:
+            self.metrics[name] = Callback(name, help_text, fn, kind)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                print(f"⚠️ Metrik {metric.name} error: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def cpu_temperature():
+    """Suhu CPU (°C) dari sysfs, None kalau tidak tersedia"""
+    try:
+        with open(THERMAL_PATH) as f:
+            return int(f.read().strip()) / 1000.0
+    except (OSError, ValueError):
+        return None
+
+
+def throttled():
+    """Bit get_throttled firmware Pi (0 = normal), None kalau tidak tersedia"""
+    try:
+        with open(THROTTLED_PATH) as f:
+            return int(f.read().strip(), 16)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,68 @@
+"""
+Inverted index trigram karakter untuk shortlist kandidat nama obat.
+
+Katalog produksi bisa puluhan ribu SKU, jadi Levenshtein ke semua nama
+terlalu mahal. Index ini memilih beberapa ratus kandidat dengan overlap
+trigram (Dice) tertinggi, lalu MedicineMatcher me-rerank kandidat itu
+dengan edit distance yang exact.
+
+Postings disimpan format CSR (offsets + postings) di array NumPy supaya
+bisa langsung ditulis/dibaca sebagai blok biner.
+"""
+import numpy as np
+
+
+def trigrams(text):
+    """Set trigram dari teks yang sudah di-normalize, dengan padding spasi"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self, grams, offsets, postings, gram_counts):
+        self.grams = grams                 # list trigram, urut
+        self.offsets = offsets             # int64, len(grams) + 1
+        self.postings = postings           # int32, id nama per trigram
+        self.gram_counts = gram_counts     # int32, jumlah trigram per nama
+        self.gram_ids = {g: i for i, g in enumerate(grams)}
+
+    @classmethod
+    def build(cls, keys):
+        """Bangun index dari daftar nama yang sudah di-normalize"""
+        posting_map = {}
+        gram_counts = np.zeros(len(keys), dtype=np.int32)
+        for doc, key in enumerate(keys):
+            grams = trigrams(key)
+            gram_counts[doc] = len(grams)
+            for g in grams:
+                posting_map.setdefault(g, []).append(doc)
+
+        grams = sorted(posting_map)
+        lengths = np.fromiter((len(posting_map[g]) for g in grams), dtype=np.int64, count=len(grams))
+        offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        postings = np.empty(int(offsets[-1]), dtype=np.int32)
+        for i, g in enumerate(grams):
+            postings[offsets[i]:offsets[i + 1]] = posting_map[g]
+        return cls(grams, offsets, postings, gram_counts)
+
+    def __len__(self):
+        return len(self.gram_counts)
+
+    def shortlist(self, key, limit=200):
+        """Index kandidat (maks `limit`) dengan skor Dice trigram tertinggi"""
+        query = trigrams(key)
+        ids = [self.gram_ids[g] for g in query if g in self.gram_ids]
+        if not ids:
+            return np.empty(0, dtype=np.int64)
+
+        hits = np.bincount(
+            np.concatenate([self.postings[self.offsets[i]:self.offsets[i + 1]] for i in ids]),
+            minlength=len(self),
+        )
+        candidates = np.flatnonzero(hits)
+        if len(candidates) <= limit:
+            return candidates
+
+        dice = 2.0 * hits[candidates] / (len(query) + self.gram_counts[candidates])
+        return candidates[np.argpartition(-dice, limit - 1)[:limit]]
@@ -0,0 +1,59 @@
+"""
+OCR batch untuk semua ROI dalam satu frame.
+
+reader.readtext(roi) per box menjalankan deteksi teks (CRAFT) dan
+recognizer terpisah untuk tiap crop. Di sini:
+  1. semua ROI di-pad ke ukuran yang sama lalu CRAFT jalan sekali
+     sebagai satu batch (reader.detect, reformat=False)
+  2. ROI grayscale disusun vertikal jadi satu kanvas, koordinat text box
+     digeser sesuai posisi ROI, lalu reader.recognize dipanggil sekali
+     dengan batch_size = jumlah text box
+Hasil per ROI formatnya sama dengan readtext: [(bbox, text, conf), ...].
+"""
+import cv2
+import numpy as np
+
+GAP = 8   # baris kosong antar ROI di kanvas recognizer
+
+
+def _pad(image, height, width):
+    return cv2.copyMakeBorder(image, 0, height - image.shape[0], 0, width - image.shape[1],
+                              cv2.BORDER_CONSTANT, value=0)
+
+
+def read_batch(reader, rois, max_batch=32):
+    """OCR banyak ROI sekaligus. Return list hasil (format readtext) per ROI"""
+    if not rois:
+        return []
+    if len(rois) == 1:
+        return [reader.readtext(rois[0])]
+
+    height = max(r.shape[0] for r in rois)
+    width = max(r.shape[1] for r in rois)
+    padded = np.stack([_pad(r, height, width) for r in rois])
+    horizontal_lists, free_lists = reader.detect(padded, reformat=False)
+
+    # susun ROI grayscale vertikal, geser semua box ke koordinat kanvas
+    stride = height + GAP
+    canvas = np.zeros((stride * len(rois), width), dtype=np.uint8)
+    all_horizontal, all_free = [], []
+    for i, (image, horizontal, free) in enumerate(zip(padded, horizontal_lists, free_lists)):
+        oy = i * stride
+        canvas[oy:oy + height] = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        for x_min, x_max, y_min, y_max in horizontal:
+            all_horizontal.append([x_min, x_max, max(0, y_min) + oy, min(height, y_max) + oy])
+        for points in free:
+            all_free.append([[x, min(max(0, y), height) + oy] for x, y in points])
+
+    results = [[] for _ in rois]
+    if not all_horizontal and not all_free:
+        return results
+
+    batch_size = min(max_batch, len(all_horizontal) + len(all_free))
+    for bbox, text, conf in reader.recognize(canvas, all_horizontal, all_free,
+                                             batch_size=batch_size, reformat=False):
+        ys = [p[1] for p in bbox]
+        i = min(int(min(ys)) // stride, len(rois) - 1)
+        oy = i * stride
+        results[i].append(([[x, y - oy] for x, y in bbox], text, conf))
+    return results
@@ -0,0 +1,299 @@
+"""
+Pool proses OCR (lepas dari GIL proses utama).
+
+EasyOCR di thread biasa berebut GIL dengan YOLO, Flask, voice loop dan
+thread warning. Di sini OCR jalan di proses worker terpisah:
+  - piksel ROI ditulis ke slot shared memory (tanpa pickle gambar),
+    yang dikirim lewat queue cuma (job_id, frame_id, slot, layout)
+  - worker baca ROI langsung dari shared memory, jalankan read_batch,
+    kirim balik teks terbaik per track_id lewat result queue
+  - thread collector di proses utama membebaskan slot lalu memanggil
+    on_result(frame_id, [(tag, text), ...])
+Slot penuh → job di-drop (OCR best effort, sama seperti DropOldestQueue).
+
+Tiap worker punya queue job sendiri, jadi kalau proses worker mati (mis.
+EasyOCR kena OOM killer di Pi) collector tahu job mana yang hilang: slotnya
+dibebaskan, on_skip(tag) dipanggil untuk tiap ROI-nya, lalu worker di-start
+ulang (maks max_restarts kali). Tanpa ini slot bocor dan OCR berhenti total.
+
+Pool harus dibuat + start() sebelum model berat di-load di proses utama
+(fork lebih ringan dan thread torch belum jalan).
+"""
+import collections
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from metrics import REGISTRY
+from ocr_batch import read_batch
+from pipeline import percentile
+
+OCR_MS = REGISTRY.histogram("vismed_ocr_ms", "Waktu OCR per batch ROI (ms)")
+
+SLOT_BYTES = 960 * 960 * 3 * 2   # muat 2 crop OCR ukuran maks (camera.MAX_CROP_SIDE)
+
+
+def default_reader(threads=1, langs=("en",)):
+    """Factory EasyOCR untuk worker (CPU, thread torch dibatasi)"""
+    import easyocr
+    import torch
+    torch.set_num_threads(threads)
+    return easyocr.Reader(list(langs), gpu=False, verbose=False)
+
+
+def _worker(reader_factory, shm_name, slot_bytes, tasks, results):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    reader = reader_factory()
+    results.put(("ready", os.getpid()))
+    while True:
+        job = tasks.get()
+        if job is None:
+            break
+        job_id, frame_id, slot, layout = job
+        base = slot * slot_bytes
+        rois = [np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=base + offset)
+                for _, offset, shape in layout]
+        t0 = time.perf_counter()
+        error = None
+        try:
+            found = read_batch(reader, rois)
+        except Exception as e:
+            found, error = [[] for _ in rois], str(e)
+        texts = [(tid, max(r, key=lambda x: x[2])[1] if r else None)
+                 for (tid, _, _), r in zip(layout, found)]
+        del rois   # lepas view ke shared memory sebelum slot dipakai ulang
+        results.put((job_id, frame_id, texts, (time.perf_counter() - t0) * 1000, error))
+    shm.close()
+
+
+class OcrPool:
+    def __init__(self, workers=2, on_result=None, slots=None, slot_bytes=SLOT_BYTES,
+                 reader_factory=default_reader, window=1024, check_s=1.0, max_restarts=5):
+        self.workers = workers
+        self.on_result = on_result
+        self.slots = slots or workers * 2
+        self.slot_bytes = slot_bytes
+        self.reader_factory = reader_factory
+        self.ctx = mp.get_context("fork")
+        self.tasks = [None] * workers          # queue job per worker
+        self.results = self.ctx.Queue()
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * slot_bytes)
+        self.free = list(range(self.slots))
+        self.pending = {}            # job_id → (slot, {track_id: tag}, t_submit, worker, on_skip)
+        self.load = [0] * workers     # job pending per worker
+        self.delivering = 0          # hasil yang sedang diteruskan ke on_result
+        self.lock = threading.Lock()
+        self.slot_freed = threading.Condition(self.lock)
+        self.procs = [None] * workers
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.check_s = check_s
+        self.max_restarts = max_restarts
+        self.stopping = False
+        self.ready_pids = set()
+        self.ready = 0
+        self.next_id = 0
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.overflow = 0
+        self.errors = 0
+        self.lost = 0                # job hilang karena worker mati
+        self.restarts = 0
+        self.last_ms = 0.0          # submit → hasil kembali
+        self.avg_ms = 0.0
+        self.last_ocr_ms = 0.0      # waktu OCR di worker saja
+        self.samples = collections.deque(maxlen=window)
+
+    def _spawn(self, i):
+        tasks = self.ctx.Queue()
+        p = self.ctx.Process(
+            target=_worker, daemon=True,
+            args=(self.reader_factory, self.shm.name, self.slot_bytes, tasks, self.results),
+        )
+        p.start()
+        with self.lock:
+            self.tasks[i] = tasks
+            self.procs[i] = p
+
+    def start(self):
+        for i in range(self.workers):
+            self._spawn(i)
+        self.collector.start()
+        return self
+
+    def submit(self, frame_id, items, block=False, on_skip=None):
+        """items = [(track_id, tag, roi)]. Return False kalau tidak ada slot kosong
+        (block=True: tunggu slot, untuk benchmark tanpa drop). on_skip(tag)
+        dipanggil untuk tiap ROI yang tidak ikut di-OCR (slot penuh / tidak muat),
+        atau nanti dari thread collector kalau worker yang memegang job-nya mati"""
+        with self.lock:
+            if block:
+                self.slot_freed.wait_for(lambda: self.free)
+            if not self.free:
+                self.dropped += 1
+                slot = None
+            else:
+                slot = self.free.pop()
+                job_id = self.next_id
+                self.next_id += 1
+                worker = min(range(self.workers), key=lambda i: self.load[i])
+        if slot is None:
+            if on_skip is not None:
+                for _, tag, _ in items:
+                    on_skip(tag)
+            return False
+
+        base = slot * self.slot_bytes
+        layout, tags, offset = [], {}, 0
+        for track_id, tag, roi in items:
+            roi = np.ascontiguousarray(roi, dtype=np.uint8)
+            if offset + roi.nbytes > self.slot_bytes:
+                self.overflow += 1
+                if on_skip is not None:
+                    on_skip(tag)
+                continue
+            view = np.ndarray(roi.shape, dtype=np.uint8, buffer=self.shm.buf, offset=base + offset)
+            view[...] = roi
+            del view
+            layout.append((track_id, offset, roi.shape))
+            tags[track_id] = tag
+            offset += (roi.nbytes + 63) // 64 * 64
+
+        with self.lock:
+            if not layout:
+                self.free.append(slot)
+                self.slot_freed.notify_all()
+                return False
+            self.pending[job_id] = (slot, tags, time.perf_counter(), worker, on_skip)
+            self.load[worker] += 1
+            self.submitted += 1
+            tasks = self.tasks[worker]
+        tasks.put((job_id, frame_id, slot, layout))
+        return True
+
+    def _reap(self):
+        """Worker yang mati: bebaskan slot job-nya, kembalikan ROI lewat on_skip, start ulang"""
+        for i, p in enumerate(self.procs):
+            if self.stopping or p.is_alive():
+                continue
+            with self.lock:
+                lost = [(job_id, entry) for job_id, entry in self.pending.items() if entry[3] == i]
+                for job_id, (slot, _, _, _, _) in lost:
+                    del self.pending[job_id]
+                    self.free.append(slot)
+                self.load[i] = 0
+                self.lost += len(lost)
+                self.errors += 1
+                if p.pid in self.ready_pids:
+                    self.ready_pids.discard(p.pid)
+                    self.ready -= 1
+                self.slot_freed.notify_all()
+                restart = self.restarts < self.max_restarts
+                if restart:
+                    self.restarts += 1
+            print(f"⚠️ OCR worker {p.pid} mati (exitcode {p.exitcode}), {len(lost)} job hilang"
+                  + ("" if restart else ", tidak di-start ulang (batas restart)"))
+            for _, (_, tags, _, _, on_skip) in lost:
+                if on_skip is not None:
+                    for tag in tags.values():
+                        on_skip(tag)
+            if restart:
+                self._spawn(i)
+
+    def _collect(self):
+        last_check = time.perf_counter()
+        while True:
+            try:
+                message = self.results.get(timeout=self.check_s)
+            except queue.Empty:
+                message = ()
+            if message is None:
+                break
+            if time.perf_counter() - last_check >= self.check_s:
+                try:
+                    self._reap()
+                except Exception as e:
+                    print(f"⚠️ OCR pool reap error: {e}")
+                last_check = time.perf_counter()
+            if not message:
+                continue
+            if message[0] == "ready":
+                with self.lock:
+                    # "ready" dari worker yang sudah mati + diganti tidak dihitung
+                    if message[1] in {p.pid for p in self.procs} and message[1] not in self.ready_pids:
+                        self.ready_pids.add(message[1])
+                        self.ready += 1
+                continue
+            job_id, frame_id, texts, ocr_ms, error = message
+            with self.lock:
+                entry = self.pending.pop(job_id, None)
+                if entry is None:
+                    continue    # job sudah dianggap hilang (worker mati setelah kirim hasil)
+                slot, tags, t_submit, worker, _ = entry
+                self.load[worker] -= 1
+                self.delivering += 1
+                self.free.append(slot)
+                self.slot_freed.notify_all()
+                self.completed += 1
+                self.last_ocr_ms = ocr_ms
+                self.last_ms = (time.perf_counter() - t_submit) * 1000
+                self.samples.append(self.last_ms)
+                self.avg_ms = self.last_ms if self.completed == 1 else 0.9 * self.avg_ms + 0.1 * self.last_ms
+                if error:
+                    self.errors += 1
+            OCR_MS.observe(ocr_ms)
+            if error:
+                print(f"OCR worker error: {error}")
+            if self.on_result:
+                try:
+                    self.on_result(frame_id, [(tags[tid], text) for tid, text in texts if text])
+                except Exception as e:
+                    print(f"⚠️ OCR callback error: {e}")
+            with self.lock:
+                self.delivering -= 1
+
+    def idle(self):
+        with self.lock:
+            return not self.pending and not self.delivering
+
+    def stop(self, timeout=5.0):
+        self.stopping = True
+        for tasks in self.tasks:
+            tasks.put(None)
+        for p in self.procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self.results.put(None)
+        self.collector.join(timeout)
+        self.shm.close()
+        self.shm.unlink()
+
+    def stats(self):
+        with self.lock:
+            values = sorted(self.samples)
+            return {
+                "workers": self.workers,
+                "ready": self.ready,
+                "alive": sum(1 for p in self.procs if p.is_alive()),
+                "slots": self.slots,
+                "in_flight": len(self.pending),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "dropped": self.dropped,
+                "overflow": self.overflow,
+                "errors": self.errors,
+                "lost": self.lost,
+                "restarts": self.restarts,
+                "last_ms": round(self.last_ms, 1),
+                "avg_ms": round(self.avg_ms, 1),
+                "last_ocr_ms": round(self.last_ocr_ms, 1),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+            }
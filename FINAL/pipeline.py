@@ -0,0 +1,190 @@
+"""
+Pipeline bertahap untuk camera loop VISMED.
+
+Tiap stage jalan di thread sendiri dan dihubungkan lewat queue terbatas.
+Kalau queue penuh, item paling lama dibuang (drop-oldest), jadi stage yang
+lambat (OCR, webhook) tidak pernah menahan stage sebelumnya.
+"""
+import collections
+import math
+import queue
+import threading
+import time
+
+
+def percentile(sorted_values, q):
+    """Percentile nearest-rank dari list yang sudah urut"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100.0 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class DropOldestQueue:
+    """Queue terbatas: put() tidak pernah block, item tertua dibuang saat penuh"""
+
+    def __init__(self, maxsize, on_drop=None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+    def put(self, item, block=False):
+        """block=True: tunggu sampai ada tempat (mode benchmark tanpa drop)"""
+        dropped = None
+        with self._cond:
+            if block:
+                self._cond.wait_for(lambda: len(self._items) < self.maxsize)
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+        # misal melepas slot frame ring; dipanggil di luar lock
+        if dropped is not None and self.on_drop:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+    def wait_space(self, timeout=None):
+        """Tunggu sampai queue tidak penuh. Return False kalau timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self._items) < self.maxsize, timeout)
+
+
+class Stage:
+    """
+    Satu worker pipeline.
+
+    Kalau maxsize=None stage dianggap source: func() dipanggil terus-menerus
+    (misal capture kamera); return False berarti tidak ada item yang dibuat
+    (polling), tidak dihitung di statistik. Selain itu func(item) dipanggil untuk tiap item
+    di inbox. Meneruskan hasil ke stage berikutnya adalah tugas func sendiri,
+    supaya satu stage bisa fan-out ke beberapa stage. on_drop(item) dipanggil
+    untuk item yang dibuang dari inbox. Latency `window` item terakhir disimpan
+    untuk p50/p95/p99.
+    """
+
+    def __init__(self, name, func, maxsize=2, on_drop=None, window=1024):
+        self.name = name
+        self.func = func
+        self.inbox = DropOldestQueue(maxsize, on_drop) if maxsize else None
+        self.processed = 0
+        self.errors = 0
+        self.busy = False
+        self.last_ms = 0.0
+        self.avg_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = collections.deque(maxlen=window)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, item, block=False):
+        self.inbox.put(item, block)
+
+    def idle(self):
+        """True kalau stage sedang tidak kerja dan inbox kosong"""
+        return not self.busy and self.inbox.qsize() == 0
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.inbox is None:
+                args = ()
+            else:
+                try:
+                    args = (self.inbox.get(timeout=0.5),)
+                except queue.Empty:
+                    continue
+
+            self.busy = True
+            t0 = time.perf_counter()
+            result = None
+            try:
+                result = self.func(*args)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Stage {self.name} error: {e}")
+            finally:
+                self.busy = False
+            if result is False and self.inbox is None:
+                continue
+            self._record((time.perf_counter() - t0) * 1000)
+
+    def _record(self, ms):
+        self.processed += 1
+        self.last_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+        self.samples.append(ms)
+        # moving average biar angka tidak loncat-loncat tiap frame
+        self.avg_ms = ms if self.processed == 1 else 0.9 * self.avg_ms + 0.1 * ms
+
+    def percentiles(self, qs=(50, 95, 99)):
+        values = sorted(self.samples)
+        return {f"p{q}": percentile(values, q) for q in qs}
+
+    def stats(self):
+        p = self.percentiles()
+        return {
+            "queue_depth": self.inbox.qsize() if self.inbox else 0,
+            "queue_max": self.inbox.maxsize if self.inbox else 0,
+            "dropped": self.inbox.dropped if self.inbox else 0,
+            "processed": self.processed,
+            "errors": self.errors,
+            "busy": self.busy,
+            "last_ms": round(self.last_ms, 2),
+            "avg_ms": round(self.avg_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": round(p["p50"], 2),
+            "p95_ms": round(p["p95"], 2),
+            "p99_ms": round(p["p99"], 2),
+        }
+
+
+class Pipeline:
+    """Kumpulan stage yang di-start/stop bersama"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage):
+        self.stages[stage.name] = stage
+        return stage
+
+    def __getitem__(self, name):
+        return self.stages[name]
+
+    def start(self):
+        for stage in self.stages.values():
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages.values():
+            stage.stop()
+
+    def idle(self):
+        """True kalau semua stage (selain source) tidak kerja dan inbox kosong"""
+        return all(stage.idle() for stage in self.stages.values() if stage.inbox is not None)
+
+    def stats(self):
+        return {name: stage.stats() for name, stage in self.stages.items()}
@@ -0,0 +1,152 @@
+"""
+Cache persisten jawaban "Berikan Informasi Obat" (teks + audio WAV).
+
+Key = nama obat ter-normalize (matcher.normalize + spasi dirapikan), jadi
+"Paracetamol" dan "PARACETAMOL " jatuh ke entry yang sama. Deteksi ulang obat yang sama
+langsung diputar dari cache: tanpa webhook, tanpa gTTS.
+
+Disimpan di satu file SQLite (atomic, aman kalau listrik Pi mati di tengah
+tulis). Entry lebih tua dari `ttl` dianggap miss; kalau total ukuran
+melebihi `max_mb`, entry yang paling lama tidak dipakai dibuang (LRU).
+
+Lihat isi cache:
+    python response_cache.py cache/obat_info.sqlite
+"""
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from matcher import normalize
+from metrics import REGISTRY
+
+CACHE_HITS = REGISTRY.counter("vismed_info_cache_hits_total", "Info obat diputar dari cache")
+CACHE_MISSES = REGISTRY.counter("vismed_info_cache_misses_total", "Info obat tidak ada / kedaluwarsa di cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key      TEXT PRIMARY KEY,
+    name     TEXT NOT NULL,
+    text     TEXT NOT NULL,
+    audio    BLOB,
+    size     INTEGER NOT NULL,
+    created  REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def cache_key(name):
+    """Nama obat → key (dipakai juga oleh audio_bank)"""
+    return " ".join(normalize(name).split())
+
+
+class ResponseCache:
+    def __init__(self, path="cache/obat_info.sqlite", ttl=7 * 24 * 3600, max_mb=64):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        # WAL: tulis lebih sedikit ke SD card, baca tidak menunggu tulis
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(SCHEMA)
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self.db.commit()
+
+    @staticmethod
+    def key(name):
+        return cache_key(name)
+
+    def get(self, name):
+        """(teks, audio WAV bytes / None) atau None kalau miss / kedaluwarsa"""
+        key = self.key(name)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT text, audio, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[2] > self.ttl:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                CACHE_MISSES.inc()
+                return None
+            self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.hits += 1
+        CACHE_HITS.inc()
+        return row[0], row[1]
+
+    def put(self, name, text, audio=None):
+        if not text:
+            return
+        size = len(text.encode("utf-8")) + (len(audio) if audio else 0)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (key, name, text, audio, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.key(name), name, text, audio, size, now, now),
+            )
+            self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        """Buang entry LRU sampai total ukuran <= max_bytes (dipanggil dengan lock)"""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.evicted += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def invalidate(self, name=None):
+        """Hapus satu obat, atau semua kalau name None"""
+        with self.lock:
+            if name is None:
+                self.db.execute("DELETE FROM entries")
+            else:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (self.key(name),))
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def stats(self):
+        with self.lock:
+            count, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "size_mb": round(total / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evicted": self.evicted,
+        }
+
+
+if __name__ == "__main__":
+    cache = ResponseCache(sys.argv[1] if len(sys.argv) > 1 else "cache/obat_info.sqlite")
+    now = time.time()
+    for name, size, created, accessed in cache.db.execute(
+            "SELECT name, size, created, accessed FROM entries ORDER BY accessed DESC"):
+        print(f"{name:<30} {size / 1024:8.1f} KB  umur {(now - created) / 3600:6.1f} jam  "
+              f"dipakai {(now - accessed) / 60:6.1f} menit lalu")
+    print(cache.stats())
@@ -0,0 +1,112 @@
+"""
+Jalankan camera pipeline lengkap (deteksi + OCR + matching) tanpa Pi.
+
+Sumber frame dari video / folder / USB / synthetic (lihat camera.py),
+tanpa Flask, GPIO, mic atau speaker. Default lossless + secepatnya: semua
+frame diproses (tidak ada drop), jadi angka throughput bisa diulang.
+
+Contoh:
+    python run_headless.py --model best_tuned.pt --csv obat.csv
+    python run_headless.py --model best_tuned.pt --csv obat.csv --source ../YOLO/Draft/medicine1.mp4 --ocr-workers 2
+    python run_headless.py --model best_tuned.pt --csv obat.csv --source synthetic --frames 300 --realtime
+"""
+import argparse
+import time
+
+from ocr_pool import OcrPool
+
+
+def add_arguments(parser, require_model=True):
+    parser.add_argument("--model", required=require_model, help="Weights YOLO (.pt)")
+    parser.add_argument("--csv", required=require_model, help="CSV daftar obat (kolom nama_obat)")
+    parser.add_argument("--source", default="../YOLO/Draft/medicine1.mp4",
+                        help='Video, folder gambar, gambar, "usbN", "picamera0" atau "synthetic"')
+    parser.add_argument("--frames", type=int, default=None, help="Batas jumlah frame")
+    parser.add_argument("--backend", default="torch", help="torch / onnx / openvino / ncnn / openvino-int8 / auto")
+    parser.add_argument("--calib", default=None, help="Folder kalibrasi untuk openvino-int8")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--adaptive", action="store_true", help="Deteksi adaptif (YOLO_ADAPTIVE=1)")
+    parser.add_argument("--ocr-workers", type=int, default=0, help="0 = OCR di thread proses utama")
+    parser.add_argument("--realtime", action="store_true", help="Tahan ke fps asli sumber + drop-oldest seperti di Pi")
+    parser.add_argument("--no-encode", action="store_true", help="Lewati encode JPEG")
+
+
+def build(args, window=1024):
+    """Susun VisionPipeline dari argumen. Return (vision, models, ocr_pool, decisions)"""
+    # pool dibuat sebelum model di-load (fork masih ringan)
+    ocr_pool = OcrPool(workers=args.ocr_workers).start() if args.ocr_workers > 0 else None
+
+    import easyocr
+    from camera import open_source
+    from catalog import CatalogHolder
+    from detector import load_detector
+    from model_manager import ModelManager
+    from vision import VisionPipeline
+
+    models = ModelManager(
+        lambda path: load_detector(path, backend=args.backend, imgsz=640, device=args.device, calib_dir=args.calib),
+        device=args.device,
+    )
+    models.load(args.model)
+    catalog_holder = CatalogHolder(lambda: args.csv)
+    catalog_holder.reload(force=True)
+    reader = easyocr.Reader(['en'], gpu=(args.device == "cuda")) if ocr_pool is None else None
+    if ocr_pool is not None:
+        while ocr_pool.ready < ocr_pool.workers:
+            time.sleep(0.1)
+
+    source = open_source(args.source, loop=False, realtime=args.realtime)
+    vision = VisionPipeline(source, models, catalog_holder, reader=reader, ocr_pool=ocr_pool,
+                            device=args.device, lossless=not args.realtime, encode=not args.no_encode,
+                            max_frames=args.frames, window=window)
+    vision.adaptive_enabled = lambda: args.adaptive
+
+    decisions = []
+
+    def on_confident(track):
+        decisions.append((vision.frame_count, track.id, track.medicine, track.score))
+        print(f"💊 Obat track #{track.id}: {track.medicine} (avg {track.score:.2f}%)")
+        return True
+
+    vision.on_confident = on_confident
+    return vision, models, ocr_pool, decisions
+
+
+def run(vision, ocr_pool):
+    """Jalankan sampai sumber habis. Return (stats, detik)"""
+    t0 = time.perf_counter()
+    vision.start()
+    vision.drain()
+    elapsed = time.perf_counter() - t0
+    stats = vision.stats()
+    vision.stop()
+    if ocr_pool is not None:
+        ocr_pool.stop()
+    return stats, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    vision, models, ocr_pool, decisions = build(args)
+    stats, elapsed = run(vision, ocr_pool)
+
+    print(f"\n🎞️ {stats['frames']} frame dari {args.source} dalam {elapsed:.1f} detik "
+          f"({stats['frames'] / elapsed:.2f} fps, backend {getattr(models.model, 'backend', args.backend)})")
+    for name in ("capture", "detect", "ocr", "match", "annotate"):
+        s = stats[name]
+        print(f"  {name:<9} processed {s['processed']:5d}  avg {s['avg_ms']:8.2f} ms  "
+              f"max {s['max_ms']:8.2f} ms  dropped {s['dropped']}")
+    print(f"  quality   {stats['quality']}")
+    print(f"  adaptive  {stats['adaptive']['counts']}")
+    if stats["ocr_pool"]:
+        print(f"  ocr_pool  {stats['ocr_pool']}")
+    print(f"Obat yakin: {len(decisions)}")
+    for frame_id, track_id, medicine, score in decisions:
+        print(f"  frame {frame_id:5d}  track #{track_id}: {medicine} ({score:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
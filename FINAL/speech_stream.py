@@ -0,0 +1,154 @@
+"""
+Streaming TTS per kalimat untuk jawaban webhook yang panjang.
+
+Jawaban dipecah per kalimat (aturan tanda baca Indonesia), lalu thread
+producer men-synthesize kalimat N+1 selagi kalimat N diputar. Antrian
+dibatasi (maxsize), jadi producer paling jauh `maxsize` kalimat di depan.
+Suara pertama keluar setelah kalimat pertama selesai di-synthesize, bukan
+setelah seluruh jawaban (time-to-first-audio, lihat bench_tts.py --stream).
+
+Diadaptasi dari chatfun / text2speech / play_audio di YOLO/Draft/gva7_led.py
+(tiga thread + queue), tapi potongannya per kalimat, bukan per 10 karakter.
+"""
+import queue
+import re
+import threading
+import time
+
+from metrics import REGISTRY
+
+FIRST_AUDIO_MS = REGISTRY.histogram("vismed_tts_first_audio_ms", "Teks masuk → suara pertama diputar (ms)")
+
+# kata sebelum titik yang bukan akhir kalimat walau diikuti huruf besar
+# ("dr. Budi", "No. 5", "Yth. Bapak")
+TITLES = {"dr", "drg", "prof", "no", "yth", "jl", "bpk", "sdr", "ny", "tn", "st", "an", "a.n", "u.p"}
+
+_END = re.compile(r"[.!?…]+|;|\n+")
+_MARKDOWN = re.compile(r"[*#_`]+")
+
+
+def _is_boundary(text, m):
+    mark = m.group()
+    if mark.startswith("\n") or mark in (";",):
+        return True
+    after = text[m.end():m.end() + 1]
+    if after and not after.isspace():
+        # "1.000", "0.5", "a.n.", "www.x": titik di dalam kata / angka
+        return False
+    if "." not in mark or len(mark) > 1:
+        return True    # "!", "?", "...", "?!"
+    before = text[:m.start()]
+    word = before.rsplit(None, 1)[-1] if before.strip() else ""
+    if word.lower() in TITLES:
+        return False
+    line = before.rsplit("\n", 1)[-1]
+    if word.isdigit() and line.strip() == word:
+        return False   # penomoran daftar "1. Paracetamol ..."
+    nxt = text[m.end():].lstrip()[:1]
+    # kalimat baru di Indonesia diawali huruf besar; "mg. setelah" bukan akhir kalimat
+    return not (nxt and (nxt.islower() or nxt.isdigit()))
+
+
+def _split_long(sentence, max_chars):
+    """Kalimat terlalu panjang dipecah di koma terakhir sebelum max_chars"""
+    parts = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(", ", 0, max_chars)
+        if cut <= 0:
+            cut = sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            break
+        parts.append(sentence[:cut + 1].strip())
+        sentence = sentence[cut + 1:].strip()
+    parts.append(sentence)
+    return parts
+
+
+def split_sentences(text, min_chars=20, max_chars=220):
+    """Teks jawaban → list kalimat siap TTS (potongan < min_chars digabung ke berikutnya)"""
+    text = _MARKDOWN.sub("", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    pieces, start = [], 0
+    for m in _END.finditer(text):
+        if _is_boundary(text, m):
+            pieces.append(text[start:m.end()])
+            start = m.end()
+    pieces.append(text[start:])
+
+    sentences, pending = [], ""
+    for piece in pieces:
+        piece = " ".join(piece.split())
+        if not piece or not any(ch.isalnum() for ch in piece):
+            continue
+        pending = f"{pending} {piece}".strip()
+        if len(pending) >= min_chars:
+            sentences.extend(_split_long(pending, max_chars))
+            pending = ""
+    if pending:
+        sentences.append(pending)
+    return sentences
+
+
+class SpeechStream:
+    """synthesize(teks) → audio, play(audio) blocking sampai selesai"""
+
+    def __init__(self, synthesize, play, maxsize=2, splitter=split_sentences):
+        self.synthesize = synthesize
+        self.play = play
+        self.maxsize = maxsize
+        self.splitter = splitter
+
+    def speak(self, text, keep=False):
+        """Putar teks per kalimat. Return (audio tiap kalimat kalau keep=True, stats).
+        State per panggilan, jadi aman dipanggil bersamaan dari beberapa thread"""
+        sentences = self.splitter(text)
+        chunks = queue.Queue(maxsize=self.maxsize)
+        stop = threading.Event()
+        t0 = time.perf_counter()
+
+        def produce():
+            for sentence in sentences:
+                if stop.is_set():
+                    break
+                try:
+                    audio = self.synthesize(sentence)
+                except Exception as e:
+                    print(f"[TTS Error] {e}")
+                    audio = None
+                chunks.put((sentence, audio))
+            chunks.put(None)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        first_ms, played, audios = None, 0, []
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                _, audio = item
+                if audio is None:
+                    continue
+                if first_ms is None:
+                    first_ms = (time.perf_counter() - t0) * 1000
+                    FIRST_AUDIO_MS.observe(first_ms)
+                self.play(audio)
+                played += 1
+                if keep:
+                    audios.append(audio)
+        finally:
+            # producer mungkin sedang menunggu antrian penuh: kosongkan sampai selesai
+            stop.set()
+            while producer.is_alive():
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+        stats = {
+            "sentences": len(sentences),
+            "played": played,
+            "first_audio_ms": round(first_ms, 1) if first_ms is not None else None,
+            "total_ms": round((time.perf_counter() - t0) * 1000, 1),
+        }
+        return audios, stats
@@ -0,0 +1,154 @@
+"""
+Test WebhookClient terhadap stub server lokal (http.server di 127.0.0.1:0).
+
+    python -m unittest test_webhook
+"""
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import webhook
+from webhook import WebhookClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.payloads.append(json.loads(body))
+            server.connections.add(self.client_address)
+            hit = server.hits[self.path]
+
+        if self.path == "/abort":
+            # request sudah diterima, koneksi diputus tanpa jawaban
+            self.close_connection = True
+            return
+        if self.path == "/slow":
+            time.sleep(server.slow_s)
+        if self.path == "/down" or (self.path == "/flaky" and hit == 1):
+            self._reply(503, b"tunnel down")
+            return
+        if self.path == "/dict":
+            self._reply(200, json.dumps({"message": "pesan"}).encode())
+            return
+        self._reply(200, json.dumps([{"output": "Paracetamol adalah obat demam."}]).encode())
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass    # client sudah timeout (/slow)
+
+
+class WebhookClientTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        webhook.print = lambda *args, **kwargs: None
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        cls.server.slow_s = 0.5
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        del webhook.print
+
+    def setUp(self):
+        self.server.hits = {}
+        self.server.payloads = []
+        self.server.connections = set()
+        self.client = WebhookClient(read_timeout=0.2, backoff=0.01, reset_after=0.3)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_parses_list_and_dict_output(self):
+        self.assertEqual(self.client.post(self.base + "/ok", "User", "halo"), "Paracetamol adalah obat demam.")
+        self.assertEqual(self.client.post(self.base + "/dict", "User", "halo"), "pesan")
+        self.assertEqual(self.server.payloads[0]["role"], "User")
+        self.assertEqual(self.server.payloads[0]["text"], "halo")
+
+    def test_reuses_connection(self):
+        for _ in range(5):
+            self.client.post(self.base + "/ok", "User", "halo")
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_retries_503(self):
+        self.assertEqual(self.client.post(self.base + "/flaky", "User", "halo"), "Paracetamol adalah obat demam.")
+        self.assertEqual(self.server.hits["/flaky"], 2)
+
+    def test_no_retry_on_read_timeout(self):
+        self.assertEqual(self.client.post(self.base + "/slow", "User", "halo"), "")
+        self.assertEqual(self.server.hits["/slow"], 1)
+
+    def test_no_retry_after_disconnect(self):
+        self.assertEqual(self.client.post(self.base + "/abort", "User", "ingatkan minum obat"), "")
+        self.assertEqual(self.server.hits["/abort"], 1)
+
+    def test_retries_connect_failure(self):
+        # port tertutup: connect gagal, aman di-retry (retries + 1 percobaan, lalu satu failure breaker)
+        url = "http://127.0.0.1:1/hook"
+        self.assertEqual(self.client.post(url, "User", "halo"), "")
+        self.assertEqual(self.client.breaker(url).failures, 1)
+
+    def test_circuit_open_fail_fast_then_half_open(self):
+        url = self.base + "/down"
+        for _ in range(self.client.failure_threshold):
+            self.client.post(url, "User", "halo")
+        self.assertEqual(self.client.breaker(url).state, "open")
+        hits = self.server.hits["/down"]
+
+        t0 = time.perf_counter()
+        self.assertEqual(self.client.post(url, "User", "halo"), "")
+        self.assertLess(time.perf_counter() - t0, 0.05)
+        self.assertEqual(self.server.hits["/down"], hits)
+
+        time.sleep(0.35)
+        self.assertEqual(self.client.breaker(url).state, "half_open")
+        # satu probe ke server; gagal → open lagi
+        self.client.post(url, "User", "halo")
+        self.assertGreater(self.server.hits["/down"], hits)
+        self.assertEqual(self.client.breaker(url).state, "open")
+
+    def test_half_open_probe_success_closes(self):
+        breaker = self.client.breaker(self.base + "/ok")
+        for _ in range(self.client.failure_threshold):
+            breaker.failure()
+        self.assertEqual(self.client.post(self.base + "/ok", "User", "halo"), "")
+        time.sleep(0.35)
+        self.assertEqual(self.client.post(self.base + "/ok", "User", "halo"), "Paracetamol adalah obat demam.")
+        self.assertEqual(breaker.state, "closed")
+
+    def test_submit_future_and_callback(self):
+        got = []
+        done = threading.Event()
+
+        def callback(text):
+            got.append(text)
+            done.set()
+
+        future = self.client.submit(self.base + "/ok", "System", "Berikan Informasi Obat X", callback=callback)
+        self.assertEqual(future.result(timeout=2), "Paracetamol adalah obat demam.")
+        self.assertTrue(done.wait(2))
+        self.assertEqual(got, ["Paracetamol adalah obat demam."])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Tracker box obat ala SORT (NumPy saja, tanpa Kalman / scipy).
+
+Box YOLO tiap frame dipasangkan ke track lama lewat IoU (greedy), sisanya
+lewat jarak centroid. Tiap track menyimpan hasil OCR + keputusan obatnya
+sendiri, jadi OCR cukup jalan di satu box fisik sampai bacaannya yakin,
+bukan tiap frame ke-10 untuk semua box.
+"""
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+
+def iou_matrix(a, b):
+    """IoU semua pasangan box a (N x 4) dan b (M x 4)"""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+def greedy_pairs(score, threshold, higher_is_better=True):
+    """Pasangan (baris, kolom) greedy dari matrix score, tiap baris/kolom maks sekali"""
+    pairs = []
+    if score.size == 0:
+        return pairs
+    order = np.argsort(-score if higher_is_better else score, axis=None)
+    used_r, used_c = set(), set()
+    for flat in order:
+        r, c = divmod(int(flat), score.shape[1])
+        value = score[r, c]
+        if (value < threshold) if higher_is_better else (value > threshold):
+            break
+        if r in used_r or c in used_c:
+            continue
+        used_r.add(r)
+        used_c.add(c)
+        pairs.append((r, c))
+    return pairs
+
+
+class Track:
+    def __init__(self, track_id, detection):
+        self.id = track_id
+        self.box = detection[:4]
+        self.label, self.conf = detection[4], detection[5]
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.hits = 1
+        self.misses = 0
+        # status OCR + keputusan obat per track
+        self.ocr_attempts = 0
+        self.last_ocr_frame = None
+        self.best_crop = None           # crop tertajam yang lolos quality gate
+        self.best_sharpness = 0.0
+        self.crop_fresh = False         # ada crop baru sejak OCR terakhir
+        self.text = None
+        self.readings = []
+        self.medicine = None
+        self.score = 0
+        self.confident = False
+        self.announced = False
+
+    def predicted_box(self):
+        return np.asarray(self.box, dtype=np.float32) + self.velocity
+
+    def update(self, detection):
+        box = np.asarray(detection[:4], dtype=np.float32)
+        self.velocity = 0.5 * self.velocity + 0.5 * (box - np.asarray(self.box, dtype=np.float32))
+        self.box = detection[:4]
+        self.label, self.conf = detection[4], detection[5]
+        self.hits += 1
+        self.misses = 0
+
+    def add_reading(self, text, medicine, score, confident_score=60):
+        """Simpan satu hasil OCR, keputusan = obat dengan rata-rata score tertinggi"""
+        self.text = text
+        if medicine:
+            self.readings.append((medicine, score))
+        if not self.readings:
+            return
+        score_map = defaultdict(list)
+        for name, s in self.readings:
+            score_map[name].append(s)
+        self.medicine, self.score = max(
+            ((name, sum(s) / len(s)) for name, s in score_map.items()), key=lambda x: x[1]
+        )
+        self.confident = self.score >= confident_score
+
+
+class Tracker:
+    def __init__(self, iou_threshold=0.3, centroid_ratio=0.5, max_misses=15,
+                 ocr_interval=5, max_ocr_attempts=10):
+        self.iou_threshold = iou_threshold
+        self.centroid_ratio = centroid_ratio    # maks jarak centroid relatif ke diagonal box
+        self.max_misses = max_misses
+        self.ocr_interval = ocr_interval
+        self.max_ocr_attempts = max_ocr_attempts
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def update(self, detections):
+        """Pasangkan deteksi frame ini ke track. Return list (track, detection)"""
+        matched = []
+        if self.tracks and detections:
+            predicted = np.array([t.predicted_box() for t in self.tracks])
+            boxes = np.array([d[:4] for d in detections], dtype=np.float32)
+            matched = greedy_pairs(iou_matrix(predicted, boxes), self.iou_threshold)
+
+            # sisa: pasangkan lewat jarak centroid (box gerak cepat, IoU kecil)
+            rest_t = sorted(set(range(len(self.tracks))) - {r for r, _ in matched})
+            rest_d = sorted(set(range(len(detections))) - {c for _, c in matched})
+            if rest_t and rest_d:
+                pt, bd = predicted[rest_t], boxes[rest_d]
+                ct = (pt[:, :2] + pt[:, 2:]) / 2
+                cd = (bd[:, :2] + bd[:, 2:]) / 2
+                dist = np.linalg.norm(ct[:, None] - cd[None], axis=2)
+                diag = np.linalg.norm(pt[:, 2:] - pt[:, :2], axis=1)[:, None]
+                ratio = dist / np.maximum(diag, 1.0)
+                for r, c in greedy_pairs(ratio, self.centroid_ratio, higher_is_better=False):
+                    matched.append((rest_t[r], rest_d[c]))
+
+        result = []
+        for r, c in matched:
+            self.tracks[r].update(detections[c])
+            result.append((self.tracks[r], detections[c]))
+        for r in set(range(len(self.tracks))) - {r for r, _ in matched}:
+            self.tracks[r].misses += 1
+        for c in sorted(set(range(len(detections))) - {c for _, c in matched}):
+            track = Track(next(self._ids), detections[c])
+            self.tracks.append(track)
+            result.append((track, detections[c]))
+
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        return result
+
+    def wants_crop(self, track):
+        """Track masih butuh bacaan OCR"""
+        return not track.confident and track.ocr_attempts < self.max_ocr_attempts
+
+    def offer_crop(self, track, roi, sharpness):
+        """Simpan ROI (sudah lolos quality gate) kalau lebih tajam dari crop sebelumnya"""
+        if sharpness > track.best_sharpness:
+            track.best_crop = roi.copy()
+            track.best_sharpness = sharpness
+            track.crop_fresh = True
+
+    def needs_ocr(self, track, frame_id):
+        """OCR untuk track yang belum yakin, dibatasi interval + jumlah percobaan.
+        Hanya crop baru: EasyOCR deterministik, pixel yang sama memberi teks yang sama"""
+        if not self.wants_crop(track) or not track.crop_fresh:
+            return False
+        return track.last_ocr_frame is None or frame_id - track.last_ocr_frame >= self.ocr_interval
+
+    def take_crop(self, track, frame_id):
+        """Ambil crop tertajam untuk OCR dan catat percobaannya.
+        best_sharpness di-reset, jadi crop berikutnya yang lolos quality gate
+        menggantikan crop ini (box yang diam tetap dicoba lagi dengan pixel baru)"""
+        track.ocr_attempts += 1
+        track.last_ocr_frame = frame_id
+        track.crop_fresh = False
+        track.best_sharpness = 0.0
+        return track.best_crop
+
+    def return_crop(self, track):
+        """OCR untuk crop dari take_crop() tidak jadi jalan (di-drop): percobaan dikembalikan"""
+        track.ocr_attempts = max(0, track.ocr_attempts - 1)
+        track.last_ocr_frame = None
+        track.crop_fresh = True
+
+    def stats(self):
+        return {
+            "active": len(self.tracks),
+            "confident": sum(1 for t in self.tracks if t.confident),
+            "tracks": [
+                {"id": t.id, "box": list(map(int, t.box)), "hits": t.hits, "misses": t.misses,
+                 "ocr_attempts": t.ocr_attempts, "sharpness": round(t.best_sharpness, 1),
+                 "medicine": t.medicine, "score": round(t.score, 1),
+                 "announced": t.announced}
+                for t in self.tracks
+            ],
+        }
@@ -0,0 +1,86 @@
+"""
+TTS di memori: gTTS → MP3 bytes → PCM → WAV bytes, tanpa file sementara.
+
+Jalur lama (temp.mp3 → pydub → temp_audio_*.wav → play → hapus) menulis dan
+menghapus empat file di SD card per kalimat, dan semua pemanggil berbagi
+nama "temp.mp3". Di sini MP3 dari gTTS ditulis ke BytesIO (seperti
+speak_text() di YOLO/Draft/gva7_led.py), di-decode + resample dalam satu
+pipe ffmpeg (stdin → stdout), lalu dibungkus header WAV di memori. pygame
+bisa langsung load dari BytesIO.
+
+    wav = tts_wav("Halo, vismed di sini.")
+    mixer.music.load(io.BytesIO(wav), "wav")
+"""
+import io
+import subprocess
+import wave
+
+import numpy as np
+
+FFMPEG = "ffmpeg"
+RATE = 48000     # sama dengan mixer.pre_init di checkpoint15-final.py
+
+
+def synthesize_mp3(text, lang="id", tld="co.id"):
+    from gtts import gTTS
+    buffer = io.BytesIO()
+    gTTS(text, lang=lang, tld=tld).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def decode(data, rate=RATE, channels=1):
+    """Audio apa pun (MP3 dari gTTS) → PCM int16 (frames, channels) di `rate`, satu proses ffmpeg"""
+    proc = subprocess.run(
+        [FFMPEG, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-f", "s16le", "-acodec", "pcm_s16le", "-ac", str(channels), "-ar", str(rate), "pipe:1"],
+        input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg gagal decode: {proc.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(proc.stdout, dtype=np.int16).reshape(-1, channels)
+
+
+def read_wav(data):
+    """WAV bytes → (PCM int16 (frames, channels), rate)"""
+    with wave.open(io.BytesIO(data), "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError("Hanya WAV 16-bit")
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        return pcm.reshape(-1, w.getnchannels()), w.getframerate()
+
+
+def resample(pcm, src_rate, dst_rate=RATE):
+    """Resample linear dengan NumPy (cukup untuk suara TTS)"""
+    if src_rate == dst_rate or len(pcm) == 0:
+        return pcm
+    n = int(round(len(pcm) * dst_rate / float(src_rate)))
+    src_t = np.arange(len(pcm)) / float(src_rate)
+    dst_t = np.arange(n) / float(dst_rate)
+    out = np.empty((n, pcm.shape[1]), dtype=np.int16)
+    for ch in range(pcm.shape[1]):
+        out[:, ch] = np.round(np.interp(dst_t, src_t, pcm[:, ch])).astype(np.int16)
+    return out
+
+
+def to_wav(pcm, rate=RATE):
+    """PCM int16 (frames, channels) → WAV bytes di memori"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.ascontiguousarray(pcm).tobytes())
+    return buffer.getvalue()
+
+
+def join_wav(chunks):
+    """Beberapa WAV (rate + channel sama) → satu WAV, None kalau kosong"""
+    if not chunks:
+        return None
+    decoded = [read_wav(c) for c in chunks]
+    return to_wav(np.concatenate([pcm for pcm, _ in decoded]), decoded[0][1])
+
+
+def tts_wav(text, rate=RATE):
+    """Teks → WAV bytes (mono, `rate` Hz), semua di memori"""
+    return to_wav(decode(synthesize_mp3(text), rate), rate)
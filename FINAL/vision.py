@@ -0,0 +1,307 @@
+"""
+Camera pipeline VISMED tanpa Flask / GPIO / voice.
+
+capture → detect → OCR → match → annotate/encode, tiap stage jalan di thread
+sendiri (lihat pipeline.py). Dipakai checkpoint15-final.py di Pi dan
+run_headless.py untuk replay video / folder di Linux biasa.
+
+Aplikasi bisa menambah stage sendiri ke vision.pipeline (ultrasonic,
+announce) dan memasang hook:
+  - on_detections()     : dipanggil tiap frame yang ada box
+  - on_confident(track) : track sudah yakin + belum diumumkan, return True
+                          kalau diambil (track ditandai announced)
+  - status()            : None atau (teks tambahan, warna box) untuk overlay
+
+lossless=True untuk benchmark: tidak ada frame / ROI yang di-drop, stage
+menunggu antrian berikutnya (bukan drop-oldest).
+"""
+import threading
+import time
+
+import cv2
+
+from adaptive import AdaptiveDetector
+from frame_ring import FrameRing
+from metrics import REGISTRY
+from ocr_batch import read_batch
+from pipeline import Pipeline, Stage
+from quality import QualityGate
+from tracker import Tracker
+
+YOLO_MS = REGISTRY.histogram("vismed_yolo_ms", "Waktu deteksi YOLO per frame (ms)")
+OCR_MS = REGISTRY.histogram("vismed_ocr_ms", "Waktu OCR per batch ROI (ms)")
+MATCH_MS = REGISTRY.histogram("vismed_match_ms", "Waktu fuzzy matching per batch teks (ms)")
+ENCODE_MS = REGISTRY.histogram("vismed_jpeg_encode_ms", "Waktu encode JPEG stream (ms)")
+
+
+class VisionPipeline:
+    def __init__(self, source, models, catalog, reader=None, ocr_pool=None, broadcaster=None,
+                 device="cpu", ring_slots=8, lossless=False, encode=True, max_frames=None, window=1024):
+        self.source = source
+        self.models = models            # .model → detector aktif (ModelManager)
+        self.catalog = catalog          # .matcher → MedicineMatcher aktif (CatalogHolder)
+        self.reader = reader
+        self.ocr_pool = ocr_pool
+        self.broadcaster = broadcaster
+        self.lossless = lossless
+        self.encode = encode
+        self.max_frames = max_frames
+
+        # YOLO_ADAPTIVE=1: cek presence di imgsz rendah + deteksi penuh hanya di crop
+        self.adaptive = AdaptiveDetector(device=device)
+        self.adaptive_enabled = lambda: False
+        # track ID stabil per box fisik: OCR jalan per track sampai yakin
+        self.tracker = Tracker()
+        # ROI blur / gerak / terlalu gelap-terang tidak dikirim ke OCR
+        self.quality = QualityGate()
+        # slot frame dialokasikan sekali di shared memory (lihat frame_ring.py)
+        w, h = source.lores_size
+        self.ring = FrameRing(slots=ring_slots, shape=(h, w, 3))
+
+        self.on_detections = None
+        self.on_confident = None
+        self.status = None
+
+        self.frame_count = 0
+        self.ocr_jobs = 0        # frame yang dikirim ke OCR
+        self.ocr_rois = 0        # total crop yang di-OCR
+        self.finished = threading.Event()    # sumber frame habis
+        if ocr_pool is not None:
+            ocr_pool.on_result = self.ocr_done
+
+        self.pipeline = Pipeline()
+        self.pipeline.add(Stage("capture", self.capture_frame, maxsize=None, window=window))
+        self.pipeline.add(Stage("detect", self.ring.holding(self.detect_stage), maxsize=1,
+                                on_drop=self.drop_detect, window=window))
+        self.pipeline.add(Stage("ocr", self.ocr_frame, maxsize=1, on_drop=self.drop_ocr, window=window))
+        self.pipeline.add(Stage("match", self.match_frame, maxsize=2, window=window))
+        self.pipeline.add(Stage("annotate", self.ring.holding(self.encode_frame), maxsize=2,
+                                on_drop=self.ring.release_packet, window=window))
+        self.register_metrics(REGISTRY)
+
+    def _submit(self, name, item):
+        self.pipeline[name].submit(item, block=self.lossless)
+
+    # ===============================
+    # Stages
+    # ===============================
+    def capture_frame(self):
+        if self.finished.is_set():
+            time.sleep(0.05)
+            return False
+        if self.max_frames is not None and self.frame_count >= self.max_frames:
+            self.finished.set()
+            return False
+        if self.lossless and not self.pipeline["detect"].inbox.wait_space(timeout=0.05):
+            # tunggu detect di luar waktu capture, supaya latency capture = waktu baca saja
+            return False
+        slot = self.ring.acquire(self.frame_count)
+        if slot is None:
+            # semua slot masih dibaca stage lain
+            time.sleep(0.005)
+            return False
+
+        frame = self.ring.frames[slot]
+        try:
+            # frame lores ditulis langsung ke slot; resolusi tinggi tetap di
+            # sumber sampai detect selesai ambil crop OCR
+            hires = self.source.read(frame)
+        except Exception as e:
+            self.ring.release(slot)
+            print(f"⚠️ Kamera error: {e}")
+            time.sleep(0.1)
+            return False
+        if hires is None:
+            self.ring.release(slot)
+            self.finished.set()
+            return False
+
+        packet = {"frame_id": self.frame_count, "slot": slot, "frame": frame, "hires": hires}
+        self.frame_count += 1
+        self._submit("detect", packet)
+
+    def detect_frame(self, packet):
+        frame = packet["frame"]
+        yolo = self.models.model   # ambil sekali, swap model terjadi di antara frame
+        with YOLO_MS.time():
+            detections = self.adaptive.detect(yolo, frame, enabled=self.adaptive_enabled())
+        packet["tracks"] = tracked = self.tracker.update(detections)
+
+        if detections:
+            if self.on_detections is not None:
+                self.on_detections()
+
+            # gate dicek di frame lores; track simpan crop tertajam dari
+            # resolusi tinggi, OCR jalan di crop itu
+            self.quality.begin_frame(frame)
+            rois = []
+            for track, (x1, y1, x2, y2, _, _) in tracked:
+                if not (y2 > y1 and x2 > x1) or not self.tracker.wants_crop(track):
+                    continue
+                ok, metrics = self.quality.check(frame[y1:y2, x1:x2], (x1, y1, x2, y2))
+                if ok and metrics["sharpness"] > track.best_sharpness:
+                    self.tracker.offer_crop(track, packet["hires"].crop((x1, y1, x2, y2)), metrics["sharpness"])
+                if self.tracker.needs_ocr(track, packet["frame_id"]):
+                    rois.append((track, self.tracker.take_crop(track, packet["frame_id"])))
+            if rois:
+                self.ocr_jobs += 1
+                self.ocr_rois += len(rois)
+                self._submit("ocr", {"frame_id": packet["frame_id"], "rois": rois})
+
+        if self.on_confident is not None:
+            for track, _ in tracked:
+                if track.confident and not track.announced and self.on_confident(track):
+                    track.announced = True
+                    break
+
+        self.ring.retain(packet["slot"])
+        self._submit("annotate", packet)
+
+    def detect_stage(self, packet):
+        try:
+            self.detect_frame(packet)
+        finally:
+            # request kamera resolusi tinggi dikembalikan sebelum annotate
+            packet["hires"].release()
+
+    def drop_detect(self, packet):
+        packet["hires"].release()
+        self.ring.release_packet(packet)
+
+    def ocr_frame(self, packet):
+        if self.ocr_pool is not None:
+            # piksel ROI lewat shared memory, hasil balik ke ocr_done
+            # ROI yang tidak kebagian slot dikembalikan ke track, dicoba frame berikutnya
+            self.ocr_pool.submit(packet["frame_id"], [(track.id, track, roi) for track, roi in packet["rois"]],
+                                 block=self.lossless, on_skip=self.tracker.return_crop)
+            return
+
+        readings = []
+        tracks = [track for track, _ in packet["rois"]]
+        try:
+            # semua ROI frame ini dalam satu batch deteksi + recognizer
+            with OCR_MS.time():
+                results = read_batch(self.reader, [roi for _, roi in packet["rois"]])
+        except Exception as e:
+            print(f"OCR error: {e}")
+            results = []
+        for track, ocr_result in zip(tracks, results):
+            if ocr_result:
+                readings.append((track, max(ocr_result, key=lambda x: x[2])[1]))
+
+        packet["readings"] = readings
+        self._submit("match", packet)
+
+    def drop_ocr(self, packet):
+        # crop sudah diambil take_crop(): kembalikan supaya percobaan tidak hilang
+        for track, _ in packet["rois"]:
+            self.tracker.return_crop(track)
+
+    def ocr_done(self, frame_id, readings):
+        """Hasil OCR pool [(track, text)] → match stage"""
+        self._submit("match", {"frame_id": frame_id, "readings": readings})
+
+    def match_frame(self, packet):
+        texts = [detected_text for _, detected_text in packet["readings"]]
+        matcher = self.catalog.matcher   # ambil sekali, aman walau sedang reload
+        with MATCH_MS.time():
+            all_matches = matcher.match_many(texts)
+        for (track, detected_text), matches in zip(packet["readings"], all_matches):
+            best_match, score = matches[0] if matches else (None, 0)
+            if not score:
+                best_match = None
+
+            # 🔄 keputusan track = obat dengan rata-rata score tertinggi
+            track.add_reading(detected_text, best_match, score)
+            if best_match:
+                print(f"[OCR] #{track.id} {detected_text} => {best_match}, {score}% "
+                      f"(track: {track.medicine} avg {track.score:.2f}%)")
+
+    def encode_frame(self, packet):
+        # annotate pembaca terakhir slot ini, jadi boleh gambar langsung di frame
+        frame = packet["frame"]
+        status = self.status() if self.status is not None else None
+        suffix, box_color = status if status else ("", (0, 255, 0))
+
+        for track, (x1, y1, x2, y2, label, conf) in packet["tracks"]:
+            detected_text = track.text or "Tidak terbaca"
+            display_text = f"#{track.id} {label} ({conf:.2f}) - {detected_text}"
+            if track.medicine:
+                display_text += f" -> {track.medicine} ({track.score:.0f}%)"
+            display_text += suffix
+
+            cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
+            cv2.putText(frame, display_text,
+                        (x1, max(0, y1 - 10)),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.6, box_color, 2)
+
+        if not self.encode:
+            return
+        with ENCODE_MS.time():
+            ret, buffer = cv2.imencode('.jpg', frame)
+        if ret and self.broadcaster is not None:
+            self.broadcaster.publish(buffer.tobytes())
+
+    # ===============================
+    # Metrics (/metrics)
+    # ===============================
+    def register_metrics(self, registry):
+        """Counter frame + queue depth dibaca dari state pipeline saat scrape"""
+        def dropped():
+            values = [({"stage": s.name}, s.inbox.dropped) for s in self.pipeline.stages.values() if s.inbox]
+            values.append(({"stage": "frame_ring"}, self.ring.full))
+            if self.ocr_pool is not None:
+                values.append(({"stage": "ocr_pool"}, self.ocr_pool.dropped))
+            return values
+
+        registry.callback("vismed_frames_captured_total", "Frame dibaca dari kamera",
+                          lambda: self.frame_count, kind="counter")
+        registry.callback("vismed_frames_processed_total", "Frame selesai dideteksi",
+                          lambda: self.pipeline["detect"].processed, kind="counter")
+        registry.callback("vismed_frames_dropped_total", "Item di-drop per stage", dropped, kind="counter")
+        registry.callback("vismed_queue_depth", "Isi antrian per stage",
+                          lambda: [({"stage": s.name}, s.inbox.qsize()) for s in self.pipeline.stages.values() if s.inbox])
+        if self.ocr_pool is not None:
+            registry.callback("vismed_ocr_in_flight", "Job OCR yang sedang di worker",
+                              lambda: len(self.ocr_pool.pending))
+
+    # ===============================
+    # Kontrol
+    # ===============================
+    def start(self):
+        self.source.start()
+        self.pipeline.start()
+
+    def drain(self, timeout=None, poll=0.05):
+        """Tunggu sumber habis + semua stage / OCR pool selesai. Return False kalau timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        settled = 0
+        while deadline is None or time.time() < deadline:
+            idle = (self.finished.is_set() and self.pipeline.idle()
+                    and (self.ocr_pool is None or self.ocr_pool.idle()))
+            # harus idle dua kali berturut-turut: item bisa sedang pindah
+            # dari inbox ke worker saat dicek
+            settled = settled + 1 if idle else 0
+            if settled >= 2:
+                return True
+            time.sleep(poll)
+        return False
+
+    def stop(self):
+        self.pipeline.stop()
+        self.source.close()
+        self.ring.close()
+
+    def stats(self):
+        return {
+            **self.pipeline.stats(),
+            "frames": self.frame_count,
+            "ocr_jobs": self.ocr_jobs,
+            "ocr_rois": self.ocr_rois,
+            "tracker": self.tracker.stats(),
+            "quality": self.quality.stats(),
+            "adaptive": self.adaptive.stats(),
+            "frame_ring": self.ring.stats(),
+            "ocr_pool": self.ocr_pool.stats() if self.ocr_pool is not None else None,
+        }
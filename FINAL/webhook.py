@@ -0,0 +1,194 @@
+"""
+Client webhook n8n: koneksi keep-alive, retry terbatas, circuit breaker.
+
+requests.Session dipakai ulang (pool koneksi per host), jadi panggilan lewat
+tunnel ngrok tidak bayar TLS handshake tiap kali. Retry hanya untuk error
+yang pasti belum sampai ke n8n (gagal connect, 502/503/504 dari tunnel) dengan
+backoff eksponensial + jitter; read timeout dan koneksi yang putus setelah
+request terkirim tidak di-retry supaya pesan / pengingat tidak terkirim dua
+kali. Setelah beberapa kali gagal berturut-turut
+circuit host itu terbuka: panggilan berikutnya langsung gagal (return "")
+sampai reset_after detik, lalu satu panggilan percobaan (half-open).
+
+    webhook = WebhookClient()
+    text = webhook.post(url, "User", "halo")                 # blocking
+    future = webhook.submit(url, "System", "Berikan ...")    # async
+    ...
+    text = future.result()
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from metrics import REGISTRY
+
+WEBHOOK_MS = REGISTRY.histogram("vismed_webhook_ms", "Round-trip webhook n8n per percobaan (ms)")
+WEBHOOK_ERRORS = REGISTRY.counter("vismed_webhook_errors_total", "Webhook gagal / status bukan 200")
+WEBHOOK_RETRIES = REGISTRY.counter("vismed_webhook_retries_total", "Percobaan ulang webhook")
+WEBHOOK_REJECTED = REGISTRY.counter("vismed_webhook_rejected_total", "Panggilan ditolak karena circuit terbuka")
+
+RETRY_STATUS = (502, 503, 504)    # ngrok / proxy: request belum sampai ke n8n
+
+
+class CircuitBreaker:
+    """closed → open setelah `failure_threshold` gagal berturut-turut → half-open setelah `reset_after` detik"""
+
+    def __init__(self, failure_threshold=3, reset_after=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """True kalau panggilan boleh jalan (half-open: hanya satu percobaan sekaligus)"""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+def connect_failed(error):
+    """True kalau request pasti belum terkirim: gagal connect / DNS / connect timeout.
+    "Connection aborted" / reset terjadi setelah body dikirim, jadi False"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or not error.args:
+        return False
+    reason = getattr(error.args[0], "reason", error.args[0])   # MaxRetryError.reason
+    return isinstance(reason, NewConnectionError)
+
+
+def parse_output(data):
+    """Format jawaban n8n: [{"output": ...}] atau {"output" / "message": ...}"""
+    if isinstance(data, list) and len(data) > 0:
+        return data[0].get("output", "")
+    elif isinstance(data, dict):
+        return data.get("output") or data.get("message", "")
+    return ""
+
+
+class WebhookClient:
+    def __init__(self, connect_timeout=3.05, read_timeout=20, retries=2, backoff=0.5, max_backoff=4.0,
+                 failure_threshold=3, reset_after=30.0, workers=2, pool_size=4):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.breakers = {}          # host → CircuitBreaker (satu tunnel = satu host)
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webhook")
+
+        REGISTRY.callback("vismed_webhook_circuit_open", "Host webhook dengan circuit terbuka",
+                          lambda: [({"host": h}, int(b.state != "closed")) for h, b in list(self.breakers.items())])
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_after)
+            return self.breakers[host]
+
+    def _sleep_backoff(self, attempt):
+        # full jitter: banyak client yang gagal bersamaan tidak retry serentak
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    def post(self, url, role, text):
+        """Kirim pesan, return teks jawaban ("" kalau gagal / circuit terbuka)"""
+        if not url:
+            return ""
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            WEBHOOK_REJECTED.inc()
+            print(f"⚠️ [Webhook] circuit terbuka untuk {urlsplit(url).netloc}, lewati")
+            return ""
+
+        payload = {"role": role, "text": text, "timestamp": str(time.time())}
+        for attempt in range(self.retries + 1):
+            if attempt:
+                WEBHOOK_RETRIES.inc()
+                self._sleep_backoff(attempt - 1)
+            try:
+                with WEBHOOK_MS.time():
+                    resp = self.session.post(url, json=payload, timeout=self.timeout)
+            except Exception as e:
+                WEBHOOK_ERRORS.inc()
+                print(f"[Webhook Error] {e}")
+                if connect_failed(e):
+                    continue
+                # read timeout / koneksi putus: bisa saja sudah diproses n8n, jangan kirim ulang
+                break
+
+            print(f"[Webhook] Sent: {payload}")
+            print(f"[Webhook] Response: {resp.status_code} {resp.text}")
+            if resp.status_code in RETRY_STATUS:
+                WEBHOOK_ERRORS.inc()
+                continue
+            # server menjawab: endpoint hidup walau statusnya bukan 200
+            breaker.success()
+            if resp.status_code != 200:
+                WEBHOOK_ERRORS.inc()
+                return ""
+            try:
+                return parse_output(resp.json())
+            except Exception as e:
+                print(f"[Webhook Error] {e}")
+                return ""
+
+        breaker.failure()
+        return ""
+
+    def submit(self, url, role, text, callback=None):
+        """Versi async dari post(): return Future, callback(teks) dipanggil di thread webhook"""
+        future = self.executor.submit(self.post, url, role, text)
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(f.result()))
+        return future
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+    def stats(self):
+        with self.lock:
+            breakers = dict(self.breakers)
+        return {host: {"state": b.state, "failures": b.failures} for host, b in breakers.items()}